@@ -0,0 +1,125 @@
+import json
+import time
+from typing import Dict, List, Tuple
+
+from src.compression import activer_compression, cache_compression, encodages_disponibles
+
+# Onglets dont le contenu est mesuré
+ONGLETS = ["camembert", "histogrammes", "heatmaps", "revenus", "salaires_villes", "carte"]
+
+
+def corps_onglet(onglet: str) -> str:
+    """
+    Construit le corps de la requête du callback d'affichage d'un onglet
+
+    Args:
+        onglet (str): Identifiant de l'onglet
+
+    Returns:
+        str: Le corps JSON
+    """
+    return json.dumps({
+        "output": "section-contenu.children",
+        "outputs": {"id": "section-contenu", "property": "children"},
+        "inputs": [{"id": "sections-tabs", "property": "active_tab", "value": onglet}],
+        "changedPropIds": ["sections-tabs.active_tab"],
+    })
+
+
+# Corps du callback de la carte au chargement de l'onglet (figure avec le GeoJSON des communes)
+CORPS_CARTE = json.dumps({
+    "output": "..map-graph.figure...map-title.children...map-text.children...map-variante.data..",
+    "outputs": [{"id": "map-graph", "property": "figure"}, {"id": "map-title", "property": "children"},
+                {"id": "map-text", "property": "children"}, {"id": "map-variante", "property": "data"}],
+    "inputs": [{"id": "metric-selector", "property": "value", "value": "Mediane"},
+               {"id": "departement-filter", "property": "value", "value": None},
+               {"id": "map-graph", "property": "relayoutData", "value": None}],
+    "state": [{"id": "map-variante", "property": "data", "value": None}],
+    "changedPropIds": [],
+})
+
+
+def mesurer_octets(client, encodage: str) -> List[Tuple[str, int, float]]:
+    """
+    Mesure les octets transférés pour la page, la mise en page, chaque onglet et la carte
+
+    Args:
+        client: Client de test Flask
+        encodage (str): Valeur de l'en-tête Accept-Encoding ("identity", "gzip" ou "br")
+
+    Returns:
+        List[Tuple[str, int, float]]: Nom de la ressource, octets reçus et durée (ms)
+    """
+    entetes = {"Accept-Encoding": encodage}
+    requetes = [("page", "GET", "/", None), ("mise en page", "GET", "/_dash-layout", None)]
+    requetes += [(f"onglet {onglet}", "POST", "/_dash-update-component", corps_onglet(onglet)) for onglet in ONGLETS]
+    requetes.append(("figure de la carte", "POST", "/_dash-update-component", CORPS_CARTE))
+
+    mesures = []
+    for nom, methode, url, corps in requetes:
+        debut = time.perf_counter()
+        reponse = client.open(url, method=methode, data=corps, headers=entetes,
+                              content_type="application/json" if corps else None)
+        mesures.append((nom, len(reponse.data), 1000 * (time.perf_counter() - debut)))
+    return mesures
+
+
+def mesurer_assets_carte(client) -> None:
+    """
+    Mesure les octets des assets de la carte (GeoJSON et variante TopoJSON) dans chaque
+    encodage, puis leur revalidation par ETag
+
+    Args:
+        client: Client de test Flask
+    """
+    figure = client.post("/_dash-update-component", data=CORPS_CARTE,
+                         content_type="application/json").get_json()["response"]["map-graph"]["figure"]
+    url_geojson = figure["data"][0]["geojson"]
+    for url in (url_geojson, url_geojson.replace(".geojson", ".topojson")):
+        tailles = []
+        for encodage in ["identity"] + encodages_disponibles():
+            reponse = client.get(url, headers={"Accept-Encoding": encodage})
+            tailles.append(f"{encodage} {len(reponse.data) / 1024:.1f} Ko")
+        revalidation = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": reponse.headers["ETag"]})
+        print(f"{url} : {', '.join(tailles)} ; {reponse.headers['Cache-Control']} ; "
+              f"revalidation {revalidation.status_code}")
+
+
+def bench_compression() -> None:
+    """
+    Compare les octets transférés sans compression et avec chaque encodage disponible,
+    puis mesure une revalidation de la mise en page par son ETag et les assets de la carte
+    """
+    import main
+
+    main.preparer_donnees(demarrage_rapide=True)
+    client = activer_compression(main.create_app().server).test_client()
+    encodages = ["identity"] + encodages_disponibles()
+
+    # une première passe remplit les caches des sections et des corps compressés
+    for encodage in encodages:
+        mesurer_octets(client, encodage)
+    resultats: Dict[str, List[Tuple[str, int, float]]] = {
+        encodage: mesurer_octets(client, encodage) for encodage in encodages
+    }
+
+    print(f"{'ressource':<26}" + "".join(f"{encodage:>18}" for encodage in encodages))
+    for i, (nom, _, _) in enumerate(resultats["identity"]):
+        print(f"{nom:<26}" + "".join(
+            f"{resultats[encodage][i][1] / 1024:>9.1f} Ko {resultats[encodage][i][2]:>4.1f} ms"
+            for encodage in encodages
+        ))
+    for encodage in encodages:
+        total = sum(octets for _, octets, _ in resultats[encodage])
+        print(f"total {encodage} : {total / 1024:.1f} Ko")
+
+    reponse = client.get("/_dash-layout", headers={"Accept-Encoding": "gzip"})
+    revalidation = client.get("/_dash-layout", headers={"Accept-Encoding": "gzip",
+                                                        "If-None-Match": reponse.headers["ETag"]})
+    print(f"revalidation de la mise en page : {revalidation.status_code}, {len(revalidation.data)} octets")
+    print(f"cache des corps compressés : {cache_compression.stats()}")
+    mesurer_assets_carte(client)
+
+
+if __name__ == "__main__":
+    bench_compression()
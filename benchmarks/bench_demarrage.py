@@ -0,0 +1,54 @@
+import json
+import subprocess
+import sys
+
+REPETITIONS = 3
+
+# Mesure exécutée dans un processus neuf, en mode démarrage rapide (artefacts déjà construits) :
+# import de main.py, création de l'application puis premier chargement de la page
+SCRIPT_MESURE = """
+import json, time
+debut = time.perf_counter()
+import main
+main.preparer_donnees(demarrage_rapide=True)
+app = main.create_app()
+demarrage = time.perf_counter() - debut
+
+client = app.server.test_client()
+debut = time.perf_counter()
+client.get("/")
+reponse = client.get("/_dash-layout")
+premiere_page = time.perf_counter() - debut
+print(json.dumps({"demarrage_s": demarrage, "premiere_page_s": premiere_page, "layout_octets": len(reponse.data)}))
+"""
+
+
+def mesurer_demarrage() -> dict:
+    """
+    Mesure le démarrage du serveur et le premier chargement de la page dans un processus neuf
+
+    Returns:
+        dict: Durée du démarrage, durée du premier chargement et taille de la mise en page
+    """
+    sortie = subprocess.run(
+        [sys.executable, "-c", SCRIPT_MESURE], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def bench_demarrage(repetitions: int = REPETITIONS) -> None:
+    """
+    Affiche la meilleure mesure de démarrage sur plusieurs processus
+
+    Args:
+        repetitions (int): Nombre de processus lancés
+    """
+    mesures = [mesurer_demarrage() for _ in range(repetitions)]
+    meilleure = min(mesures, key=lambda mesure: mesure["demarrage_s"])
+    print(f"démarrage (import de main.py et create_app) : {meilleure['demarrage_s']:.2f} s")
+    print(f"premier chargement de la page : {1000 * meilleure['premiere_page_s']:.0f} ms, "
+          f"mise en page de {meilleure['layout_octets'] / 1024:.0f} Ko")
+
+
+if __name__ == "__main__":
+    bench_demarrage()
@@ -0,0 +1,36 @@
+import timeit
+
+from src.data_store import get_df_filtre_idf, get_lignes_ville
+
+REPETITIONS = 200
+
+
+def bench_index_villes(repetitions: int = REPETITIONS) -> None:
+    """
+    Compare l'accès aux IRIS d'une ville par masque booléen sur tout le DataFrame
+    et par l'index ville -> lignes du data store
+
+    Args:
+        repetitions (int): Nombre de passages sur l'ensemble des villes
+    """
+    df_filtre_idf = get_df_filtre_idf()
+    villes = list(df_filtre_idf["LIBCOM"].unique())
+
+    # vérifier que les deux méthodes renvoient les mêmes lignes
+    for ville in villes:
+        assert get_lignes_ville(ville).index.equals(df_filtre_idf[df_filtre_idf["LIBCOM"] == ville].index)
+
+    duree_masque = timeit.timeit(
+        lambda: [df_filtre_idf[df_filtre_idf["LIBCOM"] == ville] for ville in villes], number=repetitions
+    )
+    duree_index = timeit.timeit(lambda: [get_lignes_ville(ville) for ville in villes], number=repetitions)
+
+    nb_acces = repetitions * len(villes)
+    print(f"{len(villes)} villes, {len(df_filtre_idf)} lignes, {nb_acces} accès")
+    print(f"masque booléen : {1e6 * duree_masque / nb_acces:.1f} µs par accès")
+    print(f"index des villes : {1e6 * duree_index / nb_acces:.1f} µs par accès "
+          f"(x{duree_masque / duree_index:.1f})")
+
+
+if __name__ == "__main__":
+    bench_index_villes()
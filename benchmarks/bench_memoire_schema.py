@@ -0,0 +1,42 @@
+import pandas as pd
+
+from src.data_store import (
+    CLEANED_DATA_PATH_COMMUNES_IDF,
+    charger_villes_idf,
+    filtrer_donnees_idf,
+    preparer_pour_partage,
+)
+from utils.clean_data import RAW_DATA_PATH_SALAIRE, apply_salary_schema, clean_data, load_data, rapport_memoire
+
+
+def bench_memoire_schema() -> None:
+    """
+    Compare la mémoire du fichier des salaires avec les types par défaut et avec
+    le schéma déclaré, colonne par colonne, puis sur le DataFrame filtré sur l'Île-de-France
+    """
+    defaut = clean_data(load_data(RAW_DATA_PATH_SALAIRE, skip_rows=5, xlsx=True))
+    # types par défaut : indicateurs numériques en float64, textes non convertis
+    defaut = defaut.apply(lambda col: pd.to_numeric(col, errors="coerce") if col.name.startswith("DEC_") else col)
+    defaut = defaut.dropna()
+    types = apply_salary_schema(defaut)
+
+    par_colonne = pd.DataFrame({
+        "defaut": defaut.memory_usage(deep=True, index=False),
+        "schema": types.memory_usage(deep=True, index=False),
+        "type": types.dtypes.astype(str),
+    })
+    print((par_colonne.assign(defaut=par_colonne["defaut"] / 1024, schema=par_colonne["schema"] / 1024)
+           .rename(columns={"defaut": "défaut (Ko)", "schema": "schéma (Ko)"}).round(1).to_string()))
+
+    memoire = rapport_memoire(defaut, types)
+    print(f"national : {memoire['avant_mo']:.2f} Mo -> {memoire['apres_mo']:.2f} Mo (-{memoire['reduction_pct']:.0f} %)")
+
+    villes_idf = charger_villes_idf(CLEANED_DATA_PATH_COMMUNES_IDF)
+    idf_types = preparer_pour_partage(filtrer_donnees_idf(types, villes_idf))
+    memoire = rapport_memoire(defaut.loc[idf_types.index], idf_types)
+    print(f"Île-de-France : {memoire['avant_mo']:.2f} Mo -> {memoire['apres_mo']:.2f} Mo "
+          f"(-{memoire['reduction_pct']:.0f} %)")
+
+
+if __name__ == "__main__":
+    bench_memoire_schema()
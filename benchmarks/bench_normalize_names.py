@@ -0,0 +1,66 @@
+import random
+import timeit
+import numpy as np
+import pandas as pd
+
+from utils.clean_data import CLEANED_DATA_PATH_SALAIRE, load_cleaned_data
+from utils.normalise_name import normalize_name, normalize_names
+
+# Alphabet des noms générés : lettres, accents, ligatures, chiffres, ponctuation, hors latin
+ALPHABET = (
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "àâäçéèêëîïôöùûüÿÀÂÄÇÉÈÊËÎÏÔÖÙÛÜŸœŒæÆß×÷"
+    "0123456789 -'’_.,()/"
+    "ΩЖ漢🙂́ "
+)
+VALEURS_MANQUANTES = [np.nan, None, pd.NA]
+
+
+def verifier_equivalence(nb_cas: int = 200, taille: int = 500, graine: int = 0) -> None:
+    """
+    Vérifie sur des noms aléatoires que normalize_names donne exactement
+    le même résultat que normalize_name appliqué ligne par ligne
+
+    Args:
+        nb_cas (int): Nombre de séries aléatoires testées
+        taille (int): Nombre de valeurs par série
+        graine (int): Graine du générateur aléatoire
+    """
+    generateur = random.Random(graine)
+    for _ in range(nb_cas):
+        # des doublons et des valeurs manquantes pour exercer la mémoïsation
+        pool = ["".join(generateur.choices(ALPHABET, k=generateur.randint(0, 30))) for _ in range(taille // 5)]
+        valeurs = [generateur.choice(pool + VALEURS_MANQUANTES + [generateur.random()]) for _ in range(taille)]
+        serie = pd.Series(valeurs, dtype=object)
+        attendu = [normalize_name(valeur) for valeur in valeurs]
+        obtenu = normalize_names(serie).tolist()
+        assert obtenu == attendu, next((v, a, o) for v, a, o in zip(valeurs, attendu, obtenu) if a != o)
+        # en catégorie, None et pd.NA deviennent NaN : on compare à la colonne convertie
+        categories = serie.astype("category")
+        assert normalize_names(categories).tolist() == [normalize_name(valeur) for valeur in categories]
+    print(f"Équivalence vérifiée sur {nb_cas} séries de {taille} noms aléatoires")
+
+
+def bench_normalize_names(repetitions: int = 5) -> None:
+    """
+    Compare normalize_name appliqué ligne par ligne et normalize_names
+    sur la colonne LIBCOM du fichier national des salaires
+
+    Args:
+        repetitions (int): Nombre de mesures de chaque méthode
+    """
+    libcom_categories = load_cleaned_data(CLEANED_DATA_PATH_SALAIRE)["LIBCOM"]
+    print(f"{len(libcom_categories)} lignes, {libcom_categories.nunique()} communes distinctes")
+
+    # colonne en texte (comme lue depuis Excel) et en catégories (Parquet typé)
+    for libcom in (libcom_categories.astype(object), libcom_categories):
+        assert normalize_names(libcom).tolist() == [normalize_name(valeur) for valeur in libcom]
+        duree_apply = min(timeit.repeat(lambda: libcom.apply(normalize_name), number=1, repeat=repetitions))
+        duree_vectorisee = min(timeit.repeat(lambda: normalize_names(libcom), number=1, repeat=repetitions))
+        print(f"[{libcom.dtype}] .apply(normalize_name) : {1000 * duree_apply:.1f} ms, "
+              f"normalize_names : {1000 * duree_vectorisee:.1f} ms (x{duree_apply / duree_vectorisee:.1f})")
+
+
+if __name__ == "__main__":
+    verifier_equivalence()
+    bench_normalize_names()
@@ -0,0 +1,88 @@
+import json
+from typing import Callable, Dict
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from src.figures_statiques import FIGURES_STATIQUES, alleger_template
+
+# Facteurs de réplication des lignes : x1 pour l'Île-de-France, x10 pour l'ordre de grandeur national
+ECHELLES = [1, 10]
+
+# Figures de référence telles qu'elles étaient construites avant l'agrégation côté serveur :
+# toutes les valeurs des IRIS sont embarquées et le navigateur calcule les intervalles
+# (l'histogramme par tranches de 2500€ était déjà agrégé avec pd.cut)
+FIGURES_BRUTES: Dict[str, Callable[[pd.DataFrame], go.Figure]] = {
+    "histogramme": lambda df: px.histogram(df, x="DEC_MED18", nbins=30),
+    "heatmap_chomage": lambda df: px.density_heatmap(df, x="DEC_MED18", y="DEC_PCHO18"),
+    "heatmap_retraite": lambda df: px.density_heatmap(df, x="DEC_MED18", y="DEC_PPEN18"),
+    "heatmap_revenu_non_salarie": lambda df: px.density_heatmap(df, x="DEC_MED18", y="DEC_PAUT18", z="DEC_PCHO18"),
+}
+
+# Onglets dont le contenu est mesuré, le premier étant affiché au chargement de la page
+ONGLETS = ["camembert", "histogrammes", "heatmaps", "revenus"]
+
+
+def taille_json(fig: go.Figure) -> int:
+    """
+    Mesure la taille de la figure sérialisée en JSON compact
+
+    Args:
+        fig (go.Figure): La figure
+
+    Returns:
+        int: Taille en octets
+    """
+    return len(pio.to_json(fig, validate=False, pretty=False).encode("utf-8"))
+
+
+def mesurer_figures(df: pd.DataFrame) -> None:
+    """
+    Compare la taille des figures brutes et agrégées quand le nombre de lignes augmente
+
+    Args:
+        df (pd.DataFrame): Données filtrées sur l'Île-de-France
+    """
+    for echelle in ECHELLES:
+        donnees = pd.concat([df] * echelle, ignore_index=True)
+        print(f"{len(donnees)} lignes (x{echelle}) :")
+        for nom, construire_brute in FIGURES_BRUTES.items():
+            brute = taille_json(construire_brute(donnees))
+            agregee = taille_json(alleger_template(FIGURES_STATIQUES[nom](donnees)))
+            print(f"  {nom} : {brute / 1024:.1f} Ko -> {agregee / 1024:.1f} Ko")
+
+
+def mesurer_page() -> None:
+    """
+    Mesure les octets échangés au chargement de la page (page, mise en page et premier onglet)
+    puis à l'ouverture des autres onglets, en mode démarrage rapide
+    """
+    import main
+
+    main.preparer_donnees(demarrage_rapide=True)
+    client = main.create_app().server.test_client()
+    page = len(client.get("/").data) + len(client.get("/_dash-layout").data)
+
+    tailles = {}
+    for onglet in ONGLETS:
+        corps = {
+            "output": "section-contenu.children",
+            "outputs": {"id": "section-contenu", "property": "children"},
+            "inputs": [{"id": "sections-tabs", "property": "active_tab", "value": onglet}],
+            "changedPropIds": ["sections-tabs.active_tab"],
+        }
+        tailles[onglet] = len(client.post("/_dash-update-component", data=json.dumps(corps),
+                                          content_type="application/json").data)
+
+    print(f"chargement initial (page, mise en page, onglet {ONGLETS[0]}) : "
+          f"{(page + tailles[ONGLETS[0]]) / 1024:.1f} Ko")
+    for onglet in ONGLETS[1:]:
+        print(f"  onglet {onglet} : {tailles[onglet] / 1024:.1f} Ko")
+
+
+if __name__ == "__main__":
+    from src.data_store import get_df_filtre_idf
+
+    mesurer_figures(get_df_filtre_idf())
+    mesurer_page()
@@ -0,0 +1,100 @@
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Budget de temps d'import (cumulé, en secondes) de chaque module
+BUDGETS_IMPORT = {
+    "main": 3.0,
+    "wsgi": 3.0,
+    "utils.pipeline": 0.4,
+    "src.data_store": 0.8,
+}
+# Modules dont l'import ne doit ni lire de fichier de données ni accéder au réseau
+MODULES_SANS_EFFET = ["main", "utils.get_data", "utils.pipeline", "src.components.median_salary_by_city"]
+
+LIGNE_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def mesurer_import(module: str) -> List[Tuple[str, int, int]]:
+    """
+    Importe un module dans un processus neuf avec python -X importtime, en mode démarrage rapide
+
+    Args:
+        module (str): Nom du module à importer
+
+    Returns:
+        List[Tuple[str, int, int]]: Pour chaque module importé : nom, profondeur et temps cumulé (µs)
+    """
+    environnement = dict(os.environ, DASHBOARD_FAST_START="1")
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, env=environnement,
+    ).stderr
+    return [
+        (correspondance.group(4), len(correspondance.group(3)) // 2, int(correspondance.group(2)))
+        for correspondance in map(LIGNE_IMPORTTIME.match, stderr.splitlines())
+        if correspondance
+    ]
+
+
+def verifier_sans_effet(module: str) -> List[str]:
+    """
+    Importe un module dans un processus neuf en interceptant les ouvertures de fichiers
+    de données et les connexions réseau
+
+    Args:
+        module (str): Nom du module à importer
+
+    Returns:
+        List[str]: Les accès effectués pendant l'import (liste vide si aucun)
+    """
+    script = (
+        "import sys\n"
+        "acces = []\n"
+        "def audit(evenement, args):\n"
+        "    if evenement == 'open' and isinstance(args[0], str) and args[0].startswith('data'):\n"
+        "        acces.append(f'fichier {args[0]}')\n"
+        "    elif evenement in ('socket.connect', 'socket.getaddrinfo'):\n"
+        "        acces.append(f'réseau {args[1]}')\n"
+        "    elif evenement == 'os.mkdir':\n"
+        "        acces.append(f'dossier {args[0]}')\n"
+        "sys.addaudithook(audit)\n"
+        f"import {module}\n"
+        "print('\\n'.join(acces))\n"
+    )
+    sortie = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return [ligne for ligne in sortie.splitlines() if ligne]
+
+
+def budget_import() -> bool:
+    """
+    Vérifie les budgets de temps d'import et l'absence d'effets de bord à l'import
+
+    Returns:
+        bool: True si tous les modules respectent leur budget et n'ont pas d'effet de bord
+    """
+    respecte = True
+    for module, budget in BUDGETS_IMPORT.items():
+        mesures = mesurer_import(module)
+        duree = next((cumul for nom, profondeur, cumul in mesures if nom == module and profondeur == 0), 0) / 1e6
+        statut = "ok" if duree <= budget else "DÉPASSÉ"
+        respecte &= duree <= budget
+        print(f"{module} : {duree:.2f} s (budget {budget:.2f} s) {statut}")
+
+        # imports directs les plus coûteux
+        directs: Dict[str, int] = {nom: cumul for nom, profondeur, cumul in mesures if profondeur == 1}
+        for nom, cumul in sorted(directs.items(), key=lambda item: -item[1])[:5]:
+            print(f"    {nom} : {cumul / 1000:.0f} ms")
+
+    for module in MODULES_SANS_EFFET:
+        acces = verifier_sans_effet(module)
+        respecte &= not acces
+        resultat = "accès pendant l'import : " + ", ".join(acces) if acces else "aucun effet de bord"
+        print(f"{module} : {resultat}")
+    return respecte
+
+
+if __name__ == "__main__":
+    sys.exit(0 if budget_import() else 1)
@@ -0,0 +1,121 @@
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import requests
+
+URL_SERVEUR = "http://localhost:8000"
+VILLES = ["Bagneux", "Antony", "Montreuil", "Versailles", "Créteil", "Nanterre"]
+
+
+def requete_graphique_ville(ville: str) -> Dict[str, Any]:
+    """
+    Construit la requête du callback du graphique par ville
+
+    Args:
+        ville (str): Ville sélectionnée
+
+    Returns:
+        Dict[str, Any]: Corps de la requête /_dash-update-component
+    """
+    return {
+        "output": "..salaire-gini-graph.figure...iris-info.children..",
+        "outputs": [{"id": "salaire-gini-graph", "property": "figure"}, {"id": "iris-info", "property": "children"}],
+        "inputs": [{"id": "ville-selector", "property": "value", "value": ville}],
+        "changedPropIds": ["ville-selector.value"],
+    }
+
+
+def requete_camembert(ville: str) -> Dict[str, Any]:
+    """
+    Construit la requête du callback du diagramme circulaire
+
+    Args:
+        ville (str): Ville sélectionnée
+
+    Returns:
+        Dict[str, Any]: Corps de la requête /_dash-update-component
+    """
+    return {
+        "output": "pie-chart-container.children",
+        "outputs": {"id": "pie-chart-container", "property": "children"},
+        "inputs": [{"id": "ville-selector2", "property": "value", "value": ville.lower()}],
+        "changedPropIds": ["ville-selector2.value"],
+    }
+
+
+def memoire_workers(pid_maitre: int) -> Optional[Dict[str, float]]:
+    """
+    Mesure la mémoire des workers d'un maître gunicorn (Linux) : la PSS répartit les pages
+    partagées entre les processus, la RSS les compte dans chacun
+
+    Args:
+        pid_maitre (int): PID du processus maître
+
+    Returns:
+        Optional[Dict[str, float]]: Nombre de workers, RSS et PSS cumulées en Mo, None hors Linux
+    """
+    chemin_enfants = f"/proc/{pid_maitre}/task/{pid_maitre}/children"
+    if not os.path.isfile(chemin_enfants):
+        return None
+    with open(chemin_enfants, "r", encoding="utf-8") as file:
+        pids = [int(pid) for pid in file.read().split()]
+
+    mesures = {"workers": float(len(pids)), "rss_mo": 0.0, "pss_mo": 0.0}
+    for pid in [pid_maitre] + pids:
+        with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as file:
+            for ligne in file:
+                champ, valeur = ligne.split(":", 1)
+                if champ in ("Rss", "Pss"):
+                    mesures[f"{champ.lower()}_mo"] += int(valeur.split()[0]) / 1024
+    return mesures
+
+
+def charger(url: str, requetes: int, concurrence: int) -> None:
+    """
+    Envoie des requêtes de callbacks en parallèle et affiche le débit et les latences
+
+    Args:
+        url (str): Adresse du serveur
+        requetes (int): Nombre total de requêtes
+        concurrence (int): Nombre de requêtes simultanées
+    """
+    corps = [
+        (requete_graphique_ville if i % 2 == 0 else requete_camembert)(VILLES[(i // 2) % len(VILLES)])
+        for i in range(requetes)
+    ]
+    session = requests.Session()
+
+    def envoyer(corps_requete: Dict[str, Any]) -> float:
+        debut = time.perf_counter()
+        reponse = session.post(f"{url}/_dash-update-component", json=corps_requete, timeout=30)
+        reponse.raise_for_status()
+        return time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrence) as executeur:
+        latences: List[float] = list(executeur.map(envoyer, corps))
+    duree = time.perf_counter() - debut
+
+    latences.sort()
+    print(f"{requetes} requêtes, concurrence {concurrence} : {requetes / duree:.0f} requêtes/s")
+    print(f"latence médiane {1000 * statistics.median(latences):.1f} ms, "
+          f"p95 {1000 * latences[int(0.95 * (len(latences) - 1))]:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge des callbacks du tableau de bord")
+    parser.add_argument("--url", default=URL_SERVEUR, help="adresse du serveur")
+    parser.add_argument("--requetes", type=int, default=2000, help="nombre total de requêtes")
+    parser.add_argument("--concurrence", type=int, default=16, help="requêtes simultanées")
+    parser.add_argument("--pid-maitre", type=int, help="PID du maître gunicorn, pour mesurer la mémoire")
+    args = parser.parse_args()
+
+    charger(args.url, args.requetes, args.concurrence)
+    if args.pid_maitre:
+        memoire = memoire_workers(args.pid_maitre)
+        if memoire is not None:
+            print(f"{int(memoire['workers'])} workers : RSS cumulée {memoire['rss_mo']:.0f} Mo, "
+                  f"PSS cumulée {memoire['pss_mo']:.0f} Mo")
@@ -0,0 +1,21 @@
+# Configuration de gunicorn pour wsgi.py : gunicorn -c gunicorn.conf.py wsgi:server
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get("DASHBOARD_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("DASHBOARD_WORKERS", min(4, multiprocessing.cpu_count())))
+threads = int(os.environ.get("DASHBOARD_THREADS", "2"))
+timeout = 60
+
+# charger l'application (données, index, caches) une seule fois dans le maître, avant le fork
+preload_app = True
+
+
+def when_ready(server):
+    """
+    Gèle les objets du maître avant le premier fork : le ramasse-miettes des workers
+    ne les parcourt plus, et n'écrit donc plus dans leurs pages mémoire partagées
+    """
+    gc.freeze()
+    server.log.info(f"{gc.get_freeze_count()} objets gelés avant le fork")
@@ -1,11 +1,16 @@
-from typing import Optional
-from dash import Dash, Input, Output
+from typing import Any, Callable, Dict, Optional, Tuple
+from dash import Dash, Input, Output, html
 import dash_bootstrap_components as dbc
-import pandas as pd
+from flask import jsonify
 import os
 
 # import des composants existants
-from src.components.median_salary_by_city import create_graph_layout, update_graph
+from src.components.median_salary_by_city import (
+    create_graph_layout,
+    update_graph,
+    cache_graphiques_villes,
+    prechauffer_graphiques_villes,
+)
 from src.components.header import create_header
 from src.components.footer import create_footer
 from src.components.histogram import create_histogram
@@ -13,109 +18,251 @@ from src.components.histogram_salary_range import create_histogram_by_salary_ran
 from src.components.heatmap_chomage import generate_heatmap_chomage
 from src.components.heatmap_revenu_non_activite import generate_heatmap_revenu_non_salarie
 from src.components.heatmap_retraite import generate_heatmap_retraite
-from src.components.pie_chart import create_pie_chart_component
-from src.components.map import create_map_component, load_geojson, create_dataframe_from_geojson
+from src.components.pie_chart import create_pie_chart_component, cache_camemberts, prechauffer_camemberts
+from src.components.map import (
+    chemin_geometrie,
+    create_map_component,
+    load_geojson,
+    load_geojson_variantes,
+    create_dataframe_from_geojson,
+)
 from src.components.explanations import create_explanations_component
 from src.components.project_explanation import create_project_explanation_component
+from src.assets_carte import prechauffer_assets, publier_geojson
+from src.data_store import get_agregats, get_df_filtre_idf, get_rapport
+from src.figure_cache import FigureCache
+from src.figures_statiques import charger_figure
 
 
 # import des utilitaires
-from utils.get_data import download_all_data
-from utils.clean_data import clean_all_raw_files
-from utils.normalise_name import normalize_name
+from utils.demarrage_rapide import est_actif
+from utils.pipeline import artefacts_manquants, executer_pipeline
 
 # chemins vers les fichiers
-CLEANED_DATA_PATH_SALAIRE: str = os.path.join("data", "cleaned", "cleanedsalaire.xlsx")
-CLEANED_DATA_PATH_COMMUNES_IDF: str = os.path.join("data", "cleaned", "cleanedcommunesiledefrance.xlsx")
 GEOJSON_PATH: str = os.path.join("data", "geojson", "communesiledefrance.geojson")
 
-# télécharger et nettoyer les fichiers
-download_all_data()
-clean_all_raw_files()
-
-# charger les données
-villes_idf_df = pd.read_excel(CLEANED_DATA_PATH_COMMUNES_IDF)
-villes_idf = villes_idf_df.iloc[:, 0].apply(normalize_name).tolist()
-
-df_salaire = pd.read_excel(CLEANED_DATA_PATH_SALAIRE)
-df_salaire["LIBCOM_normalized"] = df_salaire["LIBCOM"].apply(normalize_name)
-df_filtre_IDF = df_salaire[df_salaire["LIBCOM_normalized"].isin(villes_idf)].sort_values(by="LIBCOM")
-df_filtre_IDF = df_filtre_IDF.drop(columns=["LIBCOM_normalized"])
-
-# charger les données GeoJSON et créer le DataFrame associé
-geojson_data = load_geojson(GEOJSON_PATH)
-df_data = create_dataframe_from_geojson(geojson_data)
-
-# initialiser l'application Dash
-app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
-
-# construire la mise en page
-app.layout = dbc.Container(
-    fluid=True,
-    children=[
-        create_header(),
-        dbc.Container(
-            fluid=False,
-            children=[
-                create_project_explanation_component(),  # Ajout du composant explicatif
-                create_explanations_component(), 
-                create_pie_chart_component(app, df_filtre_IDF),
-                dbc.Row(
-                    [
-                        dbc.Col(create_histogram(df_filtre_IDF), width=6, className="mb-4"),
-                        dbc.Col(create_histogram_by_salary_range(df_filtre_IDF), width=6, className="mb-4"),
-                    ],
-                    className="mb-4",
+# construire à l'avance les figures par ville, dans un thread (DASHBOARD_PRECHAUFFAGE=1)
+PRECHAUFFER_CACHES: bool = os.environ.get("DASHBOARD_PRECHAUFFAGE", "0") == "1"
+# en production (wsgi.py), le préchauffage se fait dans le processus maître avant le fork :
+# il doit alors être synchrone, les threads ne survivant pas au fork
+PRECHAUFFAGE_EN_ARRIERE_PLAN: bool = os.environ.get("DASHBOARD_PRECHAUFFAGE_ARRIERE_PLAN", "1") == "1"
+
+# étapes du pipeline reconstruites au lancement, et celles dont l'application lit les sorties
+ETAPES_APPLICATION = ["get_data", "clean_data", "agregats", "figures_statiques"]
+ETAPES_ARTEFACTS = ETAPES_APPLICATION + ["get_geojson"]
+
+# sections déjà construites, par onglet
+cache_sections = FigureCache("section")
+
+
+def preparer_donnees(demarrage_rapide: bool = False) -> None:
+    """
+    Prépare les fichiers lus par l'application : reconstruit les étapes dont les fichiers
+    locaux ont changé (les sources distantes ne sont vérifiées que par
+    python -m utils.pipeline), ou, en mode démarrage rapide, vérifie seulement que les
+    artefacts existent (sans calcul ni accès réseau)
+
+    Args:
+        demarrage_rapide (bool): Si True, ne fait que vérifier les artefacts
+
+    Raises:
+        FileNotFoundError: En mode démarrage rapide, si des artefacts sont absents
+    """
+    if not demarrage_rapide:
+        executer_pipeline(etapes=ETAPES_APPLICATION, verifier_sources=False)
+        return
+
+    manquants = artefacts_manquants(ETAPES_ARTEFACTS)
+    if manquants:
+        raise FileNotFoundError(
+            "Artefacts absents en mode démarrage rapide : " + ", ".join(manquants)
+            + ". Construisez-les avec : python -m utils.pipeline"
+        )
+
+
+def create_app(prechauffer_sections: bool = False) -> Dash:
+    """
+    Construit l'application Dash : charge les données déjà préparées, crée la mise en page
+    et enregistre les callbacks. Aucun fichier n'est lu à l'import de ce module
+
+    Args:
+        prechauffer_sections (bool): Si True, construit tout de suite toutes les sections
+            (processus maître de production, avant le fork)
+
+    Returns:
+        Dash: L'application
+    """
+    # une nouvelle application repart de sections vides
+    cache_sections.vider()
+
+    # charger les données (une seule fois par processus, via le data store partagé)
+    df_filtre_IDF = get_df_filtre_idf()
+
+    # charger les données GeoJSON et créer le DataFrame associé
+    # la version TopoJSON du GeoJSON est lue si le pipeline l'a produite
+    geojson_data = load_geojson(chemin_geometrie(GEOJSON_PATH))
+    geojson_variantes = load_geojson_variantes(GEOJSON_PATH)
+    df_data = create_dataframe_from_geojson(geojson_data, get_agregats("commune"))
+
+    # initialiser l'application Dash ; les composants des onglets n'existent pas encore
+    # au chargement de la page, leurs callbacks sont validés au moment de leur affichage
+    app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
+
+    # les sections interactives enregistrent leurs callbacks : leur mise en page (légère,
+    # les figures sont construites par les callbacks) est donc créée dès le démarrage
+    section_camembert = create_pie_chart_component(app, df_filtre_IDF)
+    section_salaires_villes = dbc.Row(
+        dbc.Col(create_graph_layout(df_filtre_IDF), width=12, className="mb-4"),
+    )
+    # la géométrie de la carte est publiée comme asset statique versionné : les figures
+    # ne contiennent que son URL, et le navigateur la met en cache. Quand des variantes
+    # par zoom existent, la carte n'affiche qu'elles : le GeoJSON complet n'est pas publié
+    urls_variantes = {
+        zoom: publier_geojson(app, variante, f"communes-z{zoom}")["geojson"]
+        for zoom, variante in geojson_variantes.items()
+    }
+    url_geojson = None if urls_variantes else publier_geojson(app, geojson_data, "communes")["geojson"]
+    section_carte = dbc.Row(
+        dbc.Col(create_map_component(app, url_geojson, df_data, urls_variantes), width=12, className="mb-4"),
+    )
+
+    # sections du tableau de bord, dans l'ordre des onglets : libellé et fonction de construction.
+    # Les figures statiques sont lues dans leurs artefacts pré-rendus à la première ouverture de leur onglet
+    sections: Dict[str, Tuple[str, Callable[[], Any]]] = {
+        "camembert": ("Sources de revenus", lambda: section_camembert),
+        "histogrammes": ("Salaires médians", lambda: dbc.Row(
+            [
+                dbc.Col(
+                    create_histogram(df_filtre_IDF, charger_figure("histogramme", df_filtre_IDF)),
+                    width=6, className="mb-4",
                 ),
-                dbc.Row(
-                    [
-                        dbc.Col(generate_heatmap_chomage(df_filtre_IDF), width=6, className="mb-4"),
-                        dbc.Col(generate_heatmap_retraite(df_filtre_IDF), width=6, className="mb-4"),
-                    ],
-                    className="mb-4",
+                dbc.Col(
+                    create_histogram_by_salary_range(
+                        df_filtre_IDF, charger_figure("histogramme_intervalles", df_filtre_IDF)
+                    ),
+                    width=6, className="mb-4",
                 ),
-                dbc.Row(
-                    [
-                        dbc.Col(generate_heatmap_revenu_non_salarie(df_filtre_IDF), width=6, className="mb-4"),
-                    ],
-                    className="mb-4",
+            ],
+            className="mb-4",
+        )),
+        "heatmaps": ("Chômage et retraites", lambda: dbc.Row(
+            [
+                dbc.Col(
+                    generate_heatmap_chomage(df_filtre_IDF, charger_figure("heatmap_chomage", df_filtre_IDF)),
+                    width=6, className="mb-4",
                 ),
-                dbc.Row(
-                    dbc.Col(create_graph_layout(df_filtre_IDF), width=12, className="mb-4"),
+                dbc.Col(
+                    generate_heatmap_retraite(df_filtre_IDF, charger_figure("heatmap_retraite", df_filtre_IDF)),
+                    width=6, className="mb-4",
                 ),
-                dbc.Row(
-                    dbc.Col(create_map_component(app, geojson_data, df_data), width=12, className="mb-4"),
+            ],
+            className="mb-4",
+        )),
+        "revenus": ("Autres revenus", lambda: dbc.Row(
+            [
+                dbc.Col(
+                    generate_heatmap_revenu_non_salarie(
+                        df_filtre_IDF, charger_figure("heatmap_revenu_non_salarie", df_filtre_IDF)
+                    ),
+                    width=6, className="mb-4",
                 ),
             ],
-            style={
-                "backgroundColor": "#f4f4f4",
-                "padding": "20px",
-                "borderRadius": "10px",
-                "boxShadow": "0px 4px 10px rgba(0, 0, 0, 0.1)",
-            },
-        ),
-        create_footer(),
-    ],
-    style={"fontFamily": "Arial, sans-serif", "paddingTop": "20px"},
-)
+            className="mb-4",
+        )),
+        "salaires_villes": ("Salaires par ville", lambda: section_salaires_villes),
+        "carte": ("Carte", lambda: section_carte),
+    }
 
-# callback principal pour mettre à jour le graphique
-@app.callback(
-    [Output("salaire-gini-graph", "figure"), Output("iris-info", "children")],
-    [Input("ville-selector", "value")],
-)
-def update_callback(ville: Optional[str]) -> tuple:
-    """
-    Met à jour le graphique et les informations textuelles en fonction de la ville sélectionnée
+    # construire la mise en page : seul l'onglet actif est rendu, par le callback afficher_section
+    app.layout = dbc.Container(
+        fluid=True,
+        children=[
+            create_header(),
+            dbc.Container(
+                fluid=False,
+                children=[
+                    create_project_explanation_component(),  # Ajout du composant explicatif
+                    create_explanations_component(), 
+                    dbc.Tabs(
+                        id="sections-tabs",
+                        active_tab=next(iter(sections)),
+                        children=[dbc.Tab(label=libelle, tab_id=nom) for nom, (libelle, _) in sections.items()],
+                        className="mb-4",
+                    ),
+                    html.Div(id="section-contenu"),
+                ],
+                style={
+                    "backgroundColor": "#f4f4f4",
+                    "padding": "20px",
+                    "borderRadius": "10px",
+                    "boxShadow": "0px 4px 10px rgba(0, 0, 0, 0.1)",
+                },
+            ),
+            create_footer(),
+        ],
+        style={"fontFamily": "Arial, sans-serif", "paddingTop": "20px"},
+    )
 
-    Args:
-        ville (Optional[str]): La ville sélectionnée dans le menu déroulant
+    if PRECHAUFFER_CACHES:
+        prechauffer_graphiques_villes(PRECHAUFFAGE_EN_ARRIERE_PLAN)
+        prechauffer_camemberts(df_filtre_IDF, PRECHAUFFAGE_EN_ARRIERE_PLAN)
+
+    # statistiques des caches de figures et du chargement des données
+    @app.server.route("/stats/cache")
+    def stats_cache():
+        """
+        Expose le taux de succès des caches de figures et les mesures du data store
+
+        Returns:
+            Response: Les statistiques au format JSON
+        """
+        return jsonify(
+            caches=[cache_graphiques_villes.stats(), cache_camemberts.stats(), cache_sections.stats()],
+            donnees=get_rapport(),
+        )
+
+    # callback d'affichage de l'onglet actif
+    @app.callback(Output("section-contenu", "children"), [Input("sections-tabs", "active_tab")])
+    def afficher_section(onglet: Optional[str]) -> Any:
+        """
+        Construit la section de l'onglet actif à sa première ouverture, puis la réutilise
+
+        Args:
+            onglet (Optional[str]): Identifiant de l'onglet actif
+
+        Returns:
+            Any: Le contenu de la section
+        """
+        if onglet not in sections:
+            return html.Div("Section inconnue.", className="text-center text-danger mt-3")
+        return cache_sections.get(onglet, sections[onglet][1])
+
+    # callback principal pour mettre à jour le graphique
+    @app.callback(
+        [Output("salaire-gini-graph", "figure"), Output("iris-info", "children")],
+        [Input("ville-selector", "value")],
+    )
+    def update_callback(ville: Optional[str]) -> tuple:
+        """
+        Met à jour le graphique et les informations textuelles en fonction de la ville sélectionnée
+
+        Args:
+            ville (Optional[str]): La ville sélectionnée dans le menu déroulant
+
+        Returns:
+            tuple: Le graphique mis à jour et les informations textuelles
+        """
+        return update_graph(ville)
+
+    if prechauffer_sections:
+        cache_sections.prechauffer(sections, lambda nom: sections[nom][1](), en_arriere_plan=False)
+        prechauffer_assets()
+
+    return app
 
-    Returns:
-        tuple: Le graphique mis à jour et les informations textuelles
-    """
-    return update_graph(ville)
 
 # Lancer l'application
 if __name__ == "__main__":
-    app.run(host="localhost", port=7999, debug=False)
+    demarrage_rapide = est_actif()
+    preparer_donnees(demarrage_rapide)
+    create_app().run(host="localhost", port=7999, debug=False)
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict
+from dash import Dash
+from flask import Flask, Response, abort, request
+
+from src.compression import choisir_encodage, compresser, encodages_disponibles
+from utils.topojson import encoder_topojson
+
+# Route des géométries de la carte : /donnees-carte/<nom>-<empreinte>.<geojson|topojson>
+URL_ASSETS_CARTE = "/donnees-carte"
+# Le nom du fichier change avec son contenu : il peut être mis en cache sans revalidation
+CACHE_CONTROL_ASSET = "public, max-age=31536000, immutable"
+
+# Assets publiés, par nom de fichier : type de contenu, empreinte, construction du contenu
+# et contenus déjà produits par encodage ("identity", "gzip", "br")
+_verrou = threading.Lock()
+_assets: Dict[str, Dict[str, Any]] = {}
+
+
+def serialiser(donnees: Dict[str, Any]) -> bytes:
+    """
+    Sérialise des données en JSON compact (sans espaces ni indentation)
+
+    Args:
+        donnees (Dict[str, Any]): Les données
+
+    Returns:
+        bytes: Le JSON encodé en UTF-8
+    """
+    return json.dumps(donnees, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def contenu_asset(fichier: str, encodage: str) -> bytes:
+    """
+    Renvoie le contenu d'un asset dans un encodage, construit puis compressé au premier accès
+
+    Args:
+        fichier (str): Nom du fichier publié
+        encodage (str): "identity", "gzip" ou "br"
+
+    Returns:
+        bytes: Le contenu
+    """
+    asset = _assets[fichier]
+    with _verrou:
+        if "identity" not in asset["contenus"]:
+            asset["contenus"]["identity"] = asset["construire"]()
+        if encodage not in asset["contenus"]:
+            asset["contenus"][encodage] = compresser(asset["contenus"]["identity"], encodage)
+        return asset["contenus"][encodage]
+
+
+def servir_asset(fichier: str) -> Response:
+    """
+    Sert un asset de la carte, compressé selon Accept-Encoding, avec un ETag par encodage
+    et un en-tête de cache longue durée (réponse 304 si le client l'a déjà)
+
+    Args:
+        fichier (str): Nom du fichier demandé
+
+    Returns:
+        Response: La réponse
+    """
+    if fichier not in _assets:
+        abort(404)
+    encodage = choisir_encodage() or "identity"
+    response = Response(contenu_asset(fichier, encodage), mimetype=_assets[fichier]["type"])
+    response.set_etag(f"{_assets[fichier]['empreinte']}-{encodage}")
+    response.headers["Cache-Control"] = CACHE_CONTROL_ASSET
+    response.vary.add("Accept-Encoding")
+    if encodage != "identity":
+        response.headers["Content-Encoding"] = encodage
+    return response.make_conditional(request)
+
+
+def enregistrer_route(server: Flask) -> None:
+    """
+    Ajoute au serveur la route des assets de la carte (une seule fois)
+
+    Args:
+        server (Flask): Le serveur de l'application
+    """
+    if "servir_asset" not in server.view_functions:
+        server.add_url_rule(f"{URL_ASSETS_CARTE}/<fichier>", "servir_asset", servir_asset)
+
+
+def _publier(fichier: str, type_contenu: str, empreinte: str, construire: Callable[[], bytes]) -> None:
+    """
+    Enregistre un asset publié (sans le reconstruire s'il l'est déjà)
+
+    Args:
+        fichier (str): Nom du fichier publié
+        type_contenu (str): Type MIME
+        empreinte (str): Empreinte du contenu
+        construire (Callable[[], bytes]): Construction du contenu non compressé
+    """
+    with _verrou:
+        if fichier not in _assets:
+            _assets[fichier] = {"type": type_contenu, "empreinte": empreinte, "construire": construire, "contenus": {}}
+
+
+def publier_geojson(app: Dash, geojson_data: Dict[str, Any], nom: str) -> Dict[str, str]:
+    """
+    Publie un GeoJSON comme asset statique versionné : JSON compact, nom de fichier portant
+    l'empreinte du contenu, compressé une fois puis mis en cache par les navigateurs.
+    Une variante TopoJSON (frontières partagées, coordonnées quantifiées) est publiée
+    sous la même empreinte et construite à la première demande
+
+    Args:
+        app (Dash): L'application Dash
+        geojson_data (Dict[str, Any]): Les données GeoJSON
+        nom (str): Nom de base du fichier publié
+
+    Returns:
+        Dict[str, str]: URL de chaque format ("geojson", "topojson")
+    """
+    contenu = serialiser(geojson_data)
+    empreinte = hashlib.sha256(contenu).hexdigest()[:16]
+    _publier(f"{nom}-{empreinte}.geojson", "application/geo+json", empreinte, lambda: contenu)
+    _publier(f"{nom}-{empreinte}.topojson", "application/json", empreinte,
+             lambda: serialiser(encoder_topojson(geojson_data, nom)))
+    enregistrer_route(app.server)
+    return {
+        format_asset: app.get_relative_path(f"{URL_ASSETS_CARTE}/{nom}-{empreinte}.{format_asset}")
+        for format_asset in ("geojson", "topojson")
+    }
+
+
+def prechauffer_assets() -> None:
+    """
+    Construit et compresse à l'avance les GeoJSON publiés dans tous les encodages
+    (avant le fork des workers en production, pour qu'ils partagent ces contenus)
+    """
+    for fichier in [fichier for fichier, asset in _assets.items() if asset["type"] == "application/geo+json"]:
+        for encodage in ["identity"] + encodages_disponibles():
+            contenu_asset(fichier, encodage)
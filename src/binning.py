@@ -0,0 +1,196 @@
+import hashlib
+import math
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from src.figure_cache import FigureCache
+
+# Histogrammes 1D : colonne, découpage (nombre d'intervalles arrondis, ou pas fixe depuis 0)
+# et fermeture des intervalles ([a, b[ comme Plotly, ou ]a, b] comme pd.cut avec "droite")
+HISTOGRAMMES_1D: Dict[str, Dict[str, Any]] = {
+    "salaire_median": {"colonne": "DEC_MED18", "nbins": 30},
+    "intervalles_salaire": {"colonne": "DEC_MED18", "pas": 2500, "droite": True},
+}
+
+# Histogrammes 2D des cartes de chaleur : colonnes x et y, et colonne sommée par case
+# (None : nombre de lignes par case)
+HISTOGRAMMES_2D: Dict[str, Dict[str, Any]] = {
+    "chomage": {"x": "DEC_MED18", "y": "DEC_PCHO18", "poids": None},
+    "retraite": {"x": "DEC_MED18", "y": "DEC_PPEN18", "poids": None},
+    "revenu_non_salarie": {"x": "DEC_MED18", "y": "DEC_PAUT18", "poids": "DEC_PCHO18"},
+}
+
+# Nombre d'intervalles visé sur chaque axe des cartes de chaleur
+NBINS_HEATMAP = 20
+# Décimales conservées pour les cases sommées (les parts de revenus ont une décimale)
+DECIMALES_SOMMES = 3
+
+# histogrammes calculés par empreinte des colonnes utilisées, invalidés quand la version
+# du data store change
+cache_histogrammes = FigureCache("histogrammes", taille_max=4)
+
+
+def pas_arrondi(etendue: float, nbins: int) -> float:
+    """
+    Choisit un pas lisible (1, 2, 2,5 ou 5 fois une puissance de 10) donnant au plus
+    nbins intervalles sur l'étendue
+
+    Args:
+        etendue (float): Écart entre la plus grande et la plus petite valeur
+        nbins (int): Nombre d'intervalles visé
+
+    Returns:
+        float: Le pas des intervalles
+    """
+    if etendue <= 0:
+        return 1.0
+    brut = etendue / nbins
+    puissance = 10 ** math.floor(math.log10(brut))
+    for facteur in (1, 2, 2.5, 5, 10):
+        if facteur * puissance >= brut:
+            return float(facteur * puissance)
+    return float(10 * puissance)
+
+
+def bornes_intervalles(valeurs: np.ndarray, nbins: Optional[int] = None,
+                       pas: Optional[float] = None, droite: bool = False) -> np.ndarray:
+    """
+    Calcule les bornes des intervalles : pas lisible et bornes alignées sur ce pas
+    (nbins), ou pas fixe depuis 0 (pas)
+
+    Args:
+        valeurs (np.ndarray): Valeurs finies de la colonne
+        nbins (Optional[int]): Nombre d'intervalles visé
+        pas (Optional[float]): Pas fixe des intervalles
+        droite (bool): Si True, intervalles fermés à droite : la dernière borne est
+            la première multiple du pas atteignant le maximum
+
+    Returns:
+        np.ndarray: Les bornes, croissantes
+    """
+    if valeurs.size == 0:
+        return np.array([0.0, 1.0])
+    minimum, maximum = float(valeurs.min()), float(valeurs.max())
+    if pas is None:
+        pas = pas_arrondi(maximum - minimum, nbins or NBINS_HEATMAP)
+        debut = math.floor(minimum / pas) * pas
+    else:
+        debut = 0.0
+    if droite:
+        nombre = max(1, math.ceil((maximum - debut) / pas))
+    else:
+        nombre = max(1, math.floor((maximum - debut) / pas) + 1)
+    return debut + pas * np.arange(nombre + 1)
+
+
+def compter_droite(valeurs: np.ndarray, bornes: np.ndarray) -> np.ndarray:
+    """
+    Compte les valeurs par intervalle fermé à droite ]a, b], comme pd.cut : une valeur
+    égale à une borne compte dans l'intervalle qu'elle termine (numpy.histogram la
+    compterait dans le suivant). Les valeurs hors des bornes ne sont pas comptées
+
+    Args:
+        valeurs (np.ndarray): Valeurs finies de la colonne
+        bornes (np.ndarray): Les bornes, croissantes
+
+    Returns:
+        np.ndarray: Les effectifs, un de moins que de bornes
+    """
+    indices = np.searchsorted(bornes, valeurs, side="left") - 1
+    indices = indices[(indices >= 0) & (indices < len(bornes) - 1)]
+    return np.bincount(indices, minlength=len(bornes) - 1)
+
+
+def colonnes_utilisees() -> List[str]:
+    """
+    Liste les colonnes lues par les histogrammes 1D et 2D
+
+    Returns:
+        List[str]: Les colonnes, triées
+    """
+    colonnes = {spec["colonne"] for spec in HISTOGRAMMES_1D.values()}
+    for spec in HISTOGRAMMES_2D.values():
+        colonnes.update(colonne for colonne in (spec["x"], spec["y"], spec["poids"]) if colonne)
+    return sorted(colonnes)
+
+
+def calculer_histogrammes(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """
+    Calcule tous les histogrammes 1D et 2D des graphiques en un seul passage :
+    chaque colonne n'est convertie qu'une fois en tableau numpy, puis comptée
+    avec numpy.histogram et numpy.histogram2d
+
+    Args:
+        df (pd.DataFrame): Données filtrées sur l'Île-de-France
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Pour chaque histogramme, ses bornes ("bornes", ou
+        "bornes_x" et "bornes_y") et ses effectifs ("comptes", indexés [y, x] en 2D)
+    """
+    tableaux = {colonne: df[colonne].to_numpy(dtype="float64", na_value=np.nan) for colonne in colonnes_utilisees()}
+    bornes: Dict[Any, np.ndarray] = {}
+
+    histogrammes: Dict[str, Dict[str, Any]] = {}
+    for nom, spec in HISTOGRAMMES_1D.items():
+        valeurs = tableaux[spec["colonne"]]
+        valeurs = valeurs[np.isfinite(valeurs)]
+        droite = spec.get("droite", False)
+        cle = (spec["colonne"], spec.get("nbins"), spec.get("pas"), droite)
+        if cle not in bornes:
+            bornes[cle] = bornes_intervalles(valeurs, nbins=spec.get("nbins"), pas=spec.get("pas"), droite=droite)
+        if droite:
+            comptes = compter_droite(valeurs, bornes[cle])
+        else:
+            comptes, _ = np.histogram(valeurs, bins=bornes[cle])
+        histogrammes[nom] = {"bornes": bornes[cle], "comptes": comptes}
+
+    for nom, spec in HISTOGRAMMES_2D.items():
+        x, y = tableaux[spec["x"]], tableaux[spec["y"]]
+        poids = tableaux[spec["poids"]] if spec["poids"] else None
+        valides = np.isfinite(x) & np.isfinite(y)
+        if poids is not None:
+            valides &= np.isfinite(poids)
+            poids = poids[valides]
+        x, y = x[valides], y[valides]
+        for colonne, valeurs in ((spec["x"], x), (spec["y"], y)):
+            cle = (colonne, NBINS_HEATMAP, None, False)
+            if cle not in bornes:
+                bornes[cle] = bornes_intervalles(valeurs, nbins=NBINS_HEATMAP)
+        bornes_x = bornes[(spec["x"], NBINS_HEATMAP, None, False)]
+        bornes_y = bornes[(spec["y"], NBINS_HEATMAP, None, False)]
+        comptes, _, _ = np.histogram2d(x, y, bins=[bornes_x, bornes_y], weights=poids)
+        # effectifs entiers, sommes arrondies : la figure JSON reste compacte
+        comptes = comptes.astype(np.int64) if poids is None else np.round(comptes, DECIMALES_SOMMES)
+        histogrammes[nom] = {"bornes_x": bornes_x, "bornes_y": bornes_y, "comptes": comptes.T}
+    return histogrammes
+
+
+def get_histogrammes(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """
+    Renvoie les histogrammes de tous les graphiques, calculés une fois par contenu des
+    colonnes utilisées (empreinte de df) et par version des données
+
+    Args:
+        df (pd.DataFrame): Données filtrées sur l'Île-de-France, ou un sous-ensemble
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Les histogrammes, par nom (voir calculer_histogrammes)
+    """
+    empreinte = hashlib.sha256(
+        pd.util.hash_pandas_object(df[colonnes_utilisees()], index=False).to_numpy().tobytes()
+    ).hexdigest()
+    return cache_histogrammes.get(empreinte, lambda: calculer_histogrammes(df))
+
+
+def centres(bornes: np.ndarray) -> np.ndarray:
+    """
+    Calcule le centre de chaque intervalle
+
+    Args:
+        bornes (np.ndarray): Les bornes des intervalles
+
+    Returns:
+        np.ndarray: Les centres, un de moins que de bornes
+    """
+    return (bornes[:-1] + bornes[1:]) / 2
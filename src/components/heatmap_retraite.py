@@ -1,27 +1,51 @@
-import plotly.express as px
+import plotly.graph_objects as go
+from typing import Optional, Union
 import pandas as pd
 from dash import dcc,html
 
-def generate_heatmap_retraite(df: pd.DataFrame) -> html.Div:
+from src.binning import centres, get_histogrammes
+
+def figure_heatmap_retraite(df: pd.DataFrame) -> go.Figure:
+    """
+    Construit la figure de la carte de chaleur montrant la part des pensions, retraites et rentes par rapport au salaire médian
+
+    Args:
+        df (pd.DataFrame): Le DataFrame contenant les données
+
+    Returns:
+        go.Figure: La carte de chaleur
+    """
+    # cases précalculées par le moteur d'intervalles : la figure ne contient que la grille
+    histogramme = get_histogrammes(df)["retraite"]
+    fig = go.Figure(
+        go.Heatmap(
+            x=centres(histogramme["bornes_x"]),
+            y=centres(histogramme["bornes_y"]),
+            z=histogramme["comptes"],
+            colorscale="Viridis",
+            colorbar=dict(title="count"),
+        )
+    )
+    fig.update_layout(
+        xaxis=dict(title="Salaire Médian (€)"),
+        yaxis=dict(title="Part des pensions/retraites (%)"),
+    )
+    return fig
+
+
+def generate_heatmap_retraite(df: pd.DataFrame, fig: Optional[Union[go.Figure, dict]] = None) -> html.Div:
     """
     Génère une carte de chaleur montrant la part des pensions, retraites et rentes par rapport au salaire médian
 
     Args:
         df (pd.DataFrame): Le DataFrame contenant les données
+        fig (Optional[Union[go.Figure, dict]]): Figure déjà construite (artefact pré-rendu), construite depuis df sinon
 
     Returns:
         html.Div: Le composant Dash contenant la carte de chaleur
     """
-    fig = px.density_heatmap(
-        df,
-        x="DEC_MED18",
-        y="DEC_PPEN18",
-        color_continuous_scale="Viridis",
-        labels={
-            "DEC_MED18": "Salaire Médian (€)",
-            "DEC_PPEN18": "Part des pensions/retraites (%)",
-        },
-    )
+    if fig is None:
+        fig = figure_heatmap_retraite(df)
     return html.Div(
         children=[
             html.H3(
@@ -1,32 +1,53 @@
-import plotly.express as px
+import plotly.graph_objects as go
+from typing import Optional, Union
 import pandas as pd
 from dash import dcc,html
 
-def generate_heatmap_revenu_non_salarie(df: pd.DataFrame) -> html.Div:
+from src.binning import centres, get_histogrammes
+
+def figure_heatmap_revenu_non_salarie(df: pd.DataFrame) -> go.Figure:
+    """
+    Construit la figure de la carte de chaleur montrant les parts de revenus des activités non salariées
+    et des autres revenus par rapport au salaire médian
+
+    Args:
+        df (pd.DataFrame): Le DataFrame contenant les données
+
+    Returns:
+        go.Figure: La carte de chaleur
+    """
+    # cases précalculées par le moteur d'intervalles : la figure ne contient que la grille
+    histogramme = get_histogrammes(df)["revenu_non_salarie"]
+    fig = go.Figure(
+        go.Heatmap(
+            x=centres(histogramme["bornes_x"]),
+            y=centres(histogramme["bornes_y"]),
+            z=histogramme["comptes"],
+            colorscale="Cividis",
+            colorbar=dict(title="sum of Part des revenus non-salariés (%)"),
+        )
+    )
+    fig.update_layout(
+        xaxis=dict(title="Salaire Médian (€)"),
+        yaxis=dict(title="Part des autres revenus (%)"),
+    )
+    return fig
+
+
+def generate_heatmap_revenu_non_salarie(df: pd.DataFrame, fig: Optional[Union[go.Figure, dict]] = None) -> html.Div:
     """
     Génère une carte de chaleur montrant les parts de revenus des activités non salariées 
     et des autres revenus par rapport au salaire médian
 
     Args:
         df (pd.DataFrame): Le DataFrame contenant les données
+        fig (Optional[Union[go.Figure, dict]]): Figure déjà construite (artefact pré-rendu), construite depuis df sinon
 
     Returns:
         html.Div: Le composant Dash contenant la carte de chaleur
     """
-    fig = px.density_heatmap(
-        df,
-        x="DEC_MED18",
-        y="DEC_PAUT18",
-        z="DEC_PCHO18",
-        color_continuous_scale="Cividis",
-        title="",
-        labels={
-            "DEC_MED18": "Salaire Médian (€)",
-            "DEC_PAUT18": "Part des autres revenus (%)",
-            "DEC_PCHO18": "Part des revenus non-salariés (%)",
-        },
-    )
-    
+    if fig is None:
+        fig = figure_heatmap_revenu_non_salarie(df)
     return html.Div(
         children=[
             html.H3(
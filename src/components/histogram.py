@@ -1,26 +1,34 @@
 # src/components/histogram.py
-import plotly.express as px
+import plotly.graph_objects as go
+from typing import Optional, Union
 import pandas as pd
 from dash import html, dcc
 
+from src.binning import centres, get_histogrammes
 
-def create_histogram(df: pd.DataFrame)->html.Div:
+
+def figure_histogram(df: pd.DataFrame) -> go.Figure:
     """
-    Génére un histograme
+    Construit la figure de l'histogramme des salaires médians
 
     Args:
         df (pd.DataFrame): les données à traité
 
     Returns:
-        html.Div: l'histogram et les textes explicatifs
+        go.Figure: l'histogramme
     """
 
-    fig = px.histogram(
-        df,
-        x="DEC_MED18",
-        title="Nombre de Villes par Intervalle de Salaires Médians en IDF tranche de 10000",
-        labels={"DEC_MED18": "Salaire Médian (€)"},
-        nbins=30,
+    # effectifs précalculés par le moteur d'intervalles : la figure ne contient que les barres
+    histogramme = get_histogrammes(df)["salaire_median"]
+    bornes = histogramme["bornes"]
+    fig = go.Figure(
+        go.Bar(
+            x=centres(bornes),
+            y=histogramme["comptes"],
+            width=bornes[1] - bornes[0],
+            customdata=[f"{debut:.0f}-{fin:.0f}" for debut, fin in zip(bornes[:-1], bornes[1:])],
+            hovertemplate="Salaire Médian (€) : %{customdata}<br>Nombre : %{y}<extra></extra>",
+        )
     )
 
     fig.update_layout(
@@ -46,6 +54,22 @@ def create_histogram(df: pd.DataFrame)->html.Div:
         paper_bgcolor="white",  
         margin=dict(l=40, r=40, t=60, b=40),
     )
+    return fig
+
+
+def create_histogram(df: pd.DataFrame, fig: Optional[Union[go.Figure, dict]] = None) -> html.Div:
+    """
+    Génére un histograme
+
+    Args:
+        df (pd.DataFrame): les données à traité
+        fig (Optional[Union[go.Figure, dict]]): Figure déjà construite (artefact pré-rendu), construite depuis df sinon
+
+    Returns:
+        html.Div: l'histogram et les textes explicatifs
+    """
+    if fig is None:
+        fig = figure_histogram(df)
 
     # composant HTML contenant le graphique et du texte explicatif
     return html.Div(
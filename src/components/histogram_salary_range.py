@@ -1,38 +1,33 @@
 # src/components/histogram_salary_range.py
 
 import plotly.graph_objects as go
+from typing import Optional, Union
 import pandas as pd
 from dash import html, dcc
 
+from src.binning import get_histogrammes
 
-def create_histogram_by_salary_range(df: pd.DataFrame) -> html.Div:
+
+def figure_histogram_by_salary_range(df: pd.DataFrame) -> go.Figure:
     """
-    Crée un histogramme des villes par intervalle de salaires médians
+    Construit la figure de l'histogramme des villes par intervalle de salaires médians
 
     Args:
         df (pd.DataFrame): Les données 
 
     Returns:
-        html.Div: Un composant contenant le graphique 
+        go.Figure: L'histogramme
     """
-    if "DEC_MED18" not in df.columns:
-        raise ValueError("La colonne 'DEC_MED18' est absente des données")
-
-    # Création des intervalles de salaires (
-    max_salary = int(df["DEC_MED18"].max())
-    bins = list(range(0, max_salary + 2500, 2500))
-    labels = [f"{x}-{x+2500}" for x in bins[:-1]]
-
-    df["salary_range"] = pd.cut(df["DEC_MED18"], bins=bins, labels=labels)
-
-    # Comptage du nombre de villes dans chaque intervalle
-    salary_counts = df["salary_range"].value_counts().sort_index()
+    # effectifs précalculés par le moteur d'intervalles (tranches de 2500€ depuis 0)
+    histogramme = get_histogrammes(df)["intervalles_salaire"]
+    bornes = histogramme["bornes"]
+    labels = [f"{debut:.0f}-{fin:.0f}" for debut, fin in zip(bornes[:-1], bornes[1:])]
 
     fig = go.Figure(
         data=[
             go.Bar(
-                x=salary_counts.index,
-                y=salary_counts.values,
+                x=labels,
+                y=histogramme["comptes"],
                 marker=dict(color="#3498db"),
                   
             )
@@ -61,6 +56,22 @@ def create_histogram_by_salary_range(df: pd.DataFrame) -> html.Div:
         paper_bgcolor="white",  
         margin=dict(l=40, r=40, t=60, b=40),
     )
+    return fig
+
+
+def create_histogram_by_salary_range(df: pd.DataFrame, fig: Optional[Union[go.Figure, dict]] = None) -> html.Div:
+    """
+    Crée un histogramme des villes par intervalle de salaires médians
+
+    Args:
+        df (pd.DataFrame): Les données 
+        fig (Optional[Union[go.Figure, dict]]): Figure déjà construite (artefact pré-rendu), construite depuis df sinon
+
+    Returns:
+        html.Div: Un composant contenant le graphique 
+    """
+    if fig is None:
+        fig = figure_histogram_by_salary_range(df)
 
     return html.Div(
         children=[
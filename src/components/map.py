@@ -1,60 +1,209 @@
+import os
+import re
+import glob
 import json
 import pandas as pd
-import plotly.express as px
-from dash import Dash, dcc, html
-from dash.dependencies import Input, Output
-from typing import Optional, Dict, Any
+import plotly.graph_objects as go
+from dash import Dash, dcc, html, ctx, Patch
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from typing import Optional, Dict, Any, Union
+
+from utils.topojson import decoder_topojson
 
 GEOJSON_PATH: str = "data/geojson/communesiledefrance.geojson"
+ZOOM_INITIAL: float = 9
 
 def load_geojson(file_path: str) -> Dict[str, Any]:
     """
-    Charge un fichier GeoJSON à partir du chemin donné
+    Charge un fichier GeoJSON à partir du chemin donné ; un fichier TopoJSON
+    est décodé en GeoJSON
 
     Args:
-        file_path (str): Chemin du fichier GeoJSON
+        file_path (str): Chemin du fichier GeoJSON ou TopoJSON
 
     Returns:
         dict: Données GeoJSON chargées
     """
     with open(file_path, "r", encoding="utf-8") as file:
-        return json.load(file)
+        donnees = json.load(file)
+    if donnees.get("type") == "Topology":
+        return decoder_topojson(donnees)
+    return donnees
+
+def chemin_geometrie(file_path: str) -> str:
+    """
+    Choisit le fichier de géométrie à charger : la version TopoJSON du GeoJSON
+    (<nom>.topojson, plus légère à lire) si elle existe et n'est pas plus ancienne
+
+    Args:
+        file_path (str): Chemin du fichier GeoJSON
 
-def create_dataframe_from_geojson(geojson_data: Dict[str, Any]) -> pd.DataFrame:
+    Returns:
+        str: Chemin du fichier TopoJSON ou du GeoJSON
+    """
+    chemin_topojson = f"{os.path.splitext(file_path)[0]}.topojson"
+    if os.path.isfile(chemin_topojson) and (
+        not os.path.isfile(file_path) or os.path.getmtime(chemin_topojson) >= os.path.getmtime(file_path)
+    ):
+        return chemin_topojson
+    return file_path
+
+def load_geojson_variantes(file_path: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Charge les variantes simplifiées d'un GeoJSON (fichiers <nom>.z<zoom>.geojson),
+    indexées par le zoom à partir duquel elles sont utilisées
+
+    Args:
+        file_path (str): Chemin du GeoJSON complet
+
+    Returns:
+        dict: Données GeoJSON de chaque variante, par zoom minimal (vide si aucune variante)
+    """
+    racine, extension = os.path.splitext(file_path)
+    variantes = {}
+    for chemin in glob.glob(f"{racine}.z*{extension}"):
+        correspondance = re.search(r"\.z(\d+)" + re.escape(extension) + "$", chemin)
+        if correspondance:
+            variantes[int(correspondance.group(1))] = load_geojson(chemin)
+    return variantes
+
+def choisir_variante(zoom: float, zooms_disponibles: list[int]) -> Optional[int]:
+    """
+    Choisit la variante la plus détaillée adaptée au niveau de zoom
+
+    Args:
+        zoom (float): Niveau de zoom courant de la carte
+        zooms_disponibles (list[int]): Zooms minimaux des variantes disponibles
+
+    Returns:
+        Optional[int]: Zoom minimal de la variante choisie, None s'il n'y a pas de variante
+    """
+    candidats = [zoom_min for zoom_min in zooms_disponibles if zoom_min <= zoom]
+    if candidats:
+        return max(candidats)
+    return min(zooms_disponibles) if zooms_disponibles else None
+
+def create_dataframe_from_geojson(geojson_data: Dict[str, Any],
+                                 agregats_communes: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Extrait les propriétés des communes depuis les données GeoJSON 
-    et les transforme en DataFrame
+    et les transforme en DataFrame. Si la table agrégée des communes est fournie,
+    les valeurs y sont lues directement (par code commune) plutôt que dans le GeoJSON
 
     Args:
         geojson_data (dict): Données GeoJSON
+        agregats_communes (Optional[pd.DataFrame]): Table agrégée des communes
 
     Returns:
         pd.DataFrame: DataFrame contenant les informations des communes
     """
-    return pd.DataFrame([
+    df_data = pd.DataFrame([
         {
             "nom": feature["properties"].get("nom", "Inconnu"),
+            "code": feature["properties"].get("code"),
             "Mediane": feature["properties"].get("mediane_salaire_moyenne", None),
             "Indice": feature["properties"].get("indice_gini_moyen", None),
             "codeDepartement": feature["properties"].get("codeDepartement", "Inconnu")
         }
         for feature in geojson_data.get("features", [])
     ])
+    if agregats_communes is not None and not df_data.empty:
+        # alignement sur l'ordre des features : une recherche par code dans la table indexée
+        agregats = agregats_communes.drop_duplicates("COM").set_index("COM")
+        codes = df_data["code"].astype(str)
+        df_data["Mediane"] = codes.map(agregats["DEC_MED18_moyenne"])
+        df_data["Indice"] = codes.map(agregats["DEC_GI18_moyenne"])
+    return df_data
+
+def valeurs_carte(df_data: pd.DataFrame, selected_metric: str, departements: Optional[list[str]]) -> Dict[str, Any]:
+    """
+    Calcule les seules données qui changent avec la métrique et le filtre :
+    valeurs de couleur, masque des communes affichées et bornes de l'échelle
+
+    Args:
+        df_data (pd.DataFrame): Données des communes
+        selected_metric (str): Métrique sélectionnée ("Mediane" ou "Indice")
+        departements (Optional[list[str]]): Liste des départements sélectionnés
+
+    Returns:
+        dict: Valeurs "z", indices "selectedpoints" (None si aucun filtre), "cmin" et "cmax"
+    """
+    valeurs = df_data[selected_metric].astype(float)
+    if departements:
+        masque = df_data["codeDepartement"].isin(departements).to_numpy()
+        indices = masque.nonzero()[0].tolist()
+        valeurs_affichees = valeurs[masque]
+    else:
+        indices = None
+        valeurs_affichees = valeurs
+
+    return {
+        "z": valeurs.astype(object).where(valeurs.notna(), None).tolist(),
+        "selectedpoints": indices,
+        "cmin": None if valeurs_affichees.isna().all() else float(valeurs_affichees.min()),
+        "cmax": None if valeurs_affichees.isna().all() else float(valeurs_affichees.max()),
+    }
+
+def create_map_figure(geojson_data: Union[str, Dict[str, Any]], df_data: pd.DataFrame,
+                      valeurs: Dict[str, Any]) -> go.Figure:
+    """
+    Construit la carte complète. Toutes les communes sont tracées ; le filtre
+    par département masque les autres via selectedpoints
+
+    Args:
+        geojson_data (Union[str, dict]): URL de l'asset GeoJSON (chargé et mis en cache
+            par le navigateur), ou données GeoJSON intégrées à la figure
+        df_data (pd.DataFrame): Données des communes
+        valeurs (dict): Valeurs calculées par valeurs_carte
 
-def create_map_component(app: Dash, geojson_data: Dict[str, Any], df_data: pd.DataFrame) -> html.Div:
+    Returns:
+        go.Figure: La carte choroplèthe
+    """
+    fig = go.Figure(
+        go.Choroplethmapbox(
+            geojson=geojson_data,
+            locations=df_data["nom"].tolist(),
+            featureidkey="properties.nom",
+            z=valeurs["z"],
+            selectedpoints=valeurs["selectedpoints"],
+            unselected={"marker": {"opacity": 0}},
+            coloraxis="coloraxis",
+            hovertext=df_data["nom"].tolist(),
+            hovertemplate="<b>%{hovertext}</b><br>Valeur=%{z}<extra></extra>",
+        )
+    )
+
+    # configurer les détails de la carte
+    fig.update_layout(
+        mapbox={"style": "open-street-map", "center": {"lat": 48.8566, "lon": 2.3522}, "zoom": ZOOM_INITIAL},
+        margin={"r": 0, "t": 0, "l": 0, "b": 0},
+        coloraxis={"colorbar": {"title": {"text": "Valeur"}}, "cmin": valeurs["cmin"], "cmax": valeurs["cmax"]},
+        uirevision="carte",  # conserver la vue de l'utilisateur quand la figure est remplacée
+    )
+    return fig
+
+def create_map_component(app: Dash, geojson_data: Optional[Union[str, Dict[str, Any]]], df_data: pd.DataFrame,
+                         geojson_variantes: Optional[Dict[int, Union[str, Dict[str, Any]]]] = None) -> html.Div:
     """
     Crée une section de mise en page contenant la carte dynamique
 
     Args:
         app (Dash): l'application Dash
-        geojson_data (dict): Données GeoJSON utilisées pour la carte
+        geojson_data (Optional[Union[str, dict]]): URL de l'asset GeoJSON, ou données GeoJSON ;
+            peut être None quand des variantes sont fournies (il n'est alors jamais affiché)
         df_data (pd.DataFrame): Données des communes
+        geojson_variantes (Optional[dict]): Variantes simplifiées (URL ou données) par zoom minimal ;
+            la carte utilise celle adaptée au zoom courant plutôt que le GeoJSON complet
 
     Returns:
         html.Div: Mise en page HTML contenant la carte dynamique
     """
+    geojson_variantes = geojson_variantes or {}
+
     layout = html.Div(
         children=[
+            dcc.Store(id="map-variante"),
             html.Div(
                 [
                     html.Label("Choisissez une métrique :", style={"fontWeight": "bold"}),
@@ -100,41 +249,50 @@ def create_map_component(app: Dash, geojson_data: Dict[str, Any], df_data: pd.Da
     )
 
     @app.callback(
-        [Output("map-graph", "figure"), Output("map-title", "children"), Output("map-text", "children")],
-        [Input("metric-selector", "value"), Input("departement-filter", "value")]
+        [Output("map-graph", "figure"), Output("map-title", "children"), Output("map-text", "children"),
+         Output("map-variante", "data")],
+        [Input("metric-selector", "value"), Input("departement-filter", "value"), Input("map-graph", "relayoutData")],
+        [State("map-variante", "data")]
     )
-    def update_map(selected_metric: str, departements: Optional[list[str]]) -> tuple[px.choropleth_mapbox, str, str]:
+    def update_map(selected_metric: str, departements: Optional[list[str]], relayout_data: Optional[dict],
+                   variante_courante: Optional[int]) -> tuple[go.Figure, str, str, Optional[int]]:
         """
-        Met à jour la carte interactive, le titre et le texte explicatif en fonction de la métrique et des départements sélectionnés
+        Met à jour la carte interactive, le titre et le texte explicatif en fonction de la métrique et des départements sélectionnés,
+        avec la variante de GeoJSON adaptée au zoom courant. La géométrie (ou son URL) n'est envoyée
+        qu'au premier affichage et aux changements de variante ; un changement de métrique ou de filtre
+        ne renvoie qu'un patch des valeurs
 
         Args:
             selected_metric (str): Métrique sélectionnée ("Mediane" ou "Indice")
             departements (Optional[list[str]]): Liste des départements sélectionnés
+            relayout_data (Optional[dict]): Dernier changement de vue de la carte (zoom, déplacement)
+            variante_courante (Optional[int]): Variante actuellement affichée
 
         Returns:
-            tuple: La carte interactive mise à jour, le titre et le texte explicatif
+            tuple: La carte interactive mise à jour, le titre, le texte explicatif et la variante affichée
         """
-        # filtrer les data
-        filtered_data = df_data[df_data["codeDepartement"].isin(departements)] if departements else df_data
+        # choisir la variante de GeoJSON adaptée au zoom
+        relayout_data = relayout_data or {}
+        if ctx.triggered_id == "map-graph" and "mapbox.zoom" not in relayout_data:
+            raise PreventUpdate
+        zoom = relayout_data.get("mapbox.zoom", ZOOM_INITIAL)
+        variante = choisir_variante(zoom, list(geojson_variantes))
+        if ctx.triggered_id == "map-graph" and variante == variante_courante:
+            # simple déplacement ou zoom sans changement de variante : rien à renvoyer
+            raise PreventUpdate
 
-        # créer la carte
-        fig = px.choropleth_mapbox(
-            filtered_data,
-            geojson=geojson_data,
-            color=selected_metric,
-            locations="nom",
-            featureidkey="properties.nom",
-            mapbox_style="open-street-map",
-            center={"lat": 48.8566, "lon": 2.3522},
-            zoom=9,
-            hover_name="nom"
-        )
-
-        # configurer les détails de la carte
-        fig.update_layout(
-            margin={"r": 0, "t": 0, "l": 0, "b": 0},
-            coloraxis_colorbar={"title": "Valeur"}
-        )
+        valeurs = valeurs_carte(df_data, selected_metric, departements)
+        if ctx.triggered_id in ("metric-selector", "departement-filter"):
+            # la géométrie est déjà dans le navigateur : n'envoyer que les valeurs et le masque
+            fig = Patch()
+            if ctx.triggered_id == "metric-selector":
+                fig["data"][0]["z"] = valeurs["z"]
+            fig["data"][0]["selectedpoints"] = valeurs["selectedpoints"]
+            fig["layout"]["coloraxis"]["cmin"] = valeurs["cmin"]
+            fig["layout"]["coloraxis"]["cmax"] = valeurs["cmax"]
+        else:
+            geojson_affiche = geojson_variantes[variante] if variante is not None else geojson_data
+            fig = create_map_figure(geojson_affiche, df_data, valeurs)
 
         # définir le titre et le texte explicatif en fonction de la métrique (gini ou median)
         if selected_metric == "Mediane":
@@ -151,6 +309,6 @@ def create_map_component(app: Dash, geojson_data: Dict[str, Any], df_data: pd.Da
                 "Un indice de 0 représente une égalité parfaite, tandis qu'un indice de 1 représente une inégalité totale."
             )
 
-        return fig, title, text
+        return fig, title, text, variante
 
     return layout
\ No newline at end of file
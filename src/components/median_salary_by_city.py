@@ -1,36 +1,14 @@
-
 from dash import html, dcc
 import plotly.express as px
 import pandas as pd
-import os
-from typing import Tuple
-from utils.normalise_name import normalize_name
+import threading
+from typing import Optional, Tuple
 import dash_bootstrap_components as dbc
+from src.data_store import get_df_filtre_idf, get_lignes_ville
+from src.figure_cache import FigureCache
 
-# Chemins vers les fichiers de données
-CLEANED_DATA_PATH_SALAIRE = os.path.join("data", "cleaned", "cleanedsalaire.xlsx")
-CLEANED_DATA_PATH_COMMUNES_IDF = os.path.join(
-    "data", "cleaned", "cleanedcommunesiledefrance.xlsx"
-)
-
-# charger la liste des villes à partir du fichier Excel
-villes_idf_df = pd.read_excel(CLEANED_DATA_PATH_COMMUNES_IDF)
-villes_idf = villes_idf_df.iloc[:, 0].apply(normalize_name).tolist()
-
-# charger le fichier des statistiques à partir d'Excel
-df_salaire = pd.read_excel(CLEANED_DATA_PATH_SALAIRE)
-
-# ajouter une colonne normalise pour la comparaison
-df_salaire["LIBCOM_normalized"] = df_salaire["LIBCOM"].apply(normalize_name)
-
-# filtrer les lignes où la colonne  est dans la liste des villes d'Île-de-France
-df_filtre_idf = df_salaire[df_salaire["LIBCOM_normalized"].isin(villes_idf)]
-
-# trier les résultats par la colonne d'origine LIBCOM
-df_filtre_idf = df_filtre_idf.sort_values(by="LIBCOM")
-
-# liste unique des villes disponibles dans la colonne LIBCOM
-villes = df_filtre_idf["LIBCOM"].unique()
+# figures déjà construites, par ville sélectionnée
+cache_graphiques_villes = FigureCache("graphique_ville")
 
 
 def create_graph_layout(df_filtre: pd.DataFrame) -> html.Div:
@@ -95,7 +73,8 @@ def create_graph_layout(df_filtre: pd.DataFrame) -> html.Div:
 
 def update_graph(selected_ville: str) -> Tuple[px.bar, html.Div]:
     """
-    Met à jour le graphique et les informations associées à la ville sélectionnée
+    Met à jour le graphique et les informations associées à la ville sélectionnée,
+    en réutilisant la figure déjà construite pour cette ville si elle existe
 
     Args:
         selected_ville (str): La ville sélectionnée dans le dropdown
@@ -103,24 +82,39 @@ def update_graph(selected_ville: str) -> Tuple[px.bar, html.Div]:
     Returns:
         Tuple[px.bar, html.Div]: Un tuple contenant la figure  et les informations 
     """
-    # filtrer les données pour la ville sélectionnée
-    filtered_df = df_filtre_idf[df_filtre_idf["LIBCOM"] == selected_ville]
+    return cache_graphiques_villes.get(selected_ville, lambda: construire_graphique(selected_ville))
+
+
+def prechauffer_graphiques_villes(en_arriere_plan: bool = True) -> Optional[threading.Thread]:
+    """
+    Construit à l'avance les graphiques de toutes les villes
+
+    Args:
+        en_arriere_plan (bool): Si True, construit dans un thread sans bloquer le démarrage
+
+    Returns:
+        Optional[threading.Thread]: Le thread de préchauffage, None si exécuté directement
+    """
+    villes = get_df_filtre_idf()["LIBCOM"].unique()
+    return cache_graphiques_villes.prechauffer(villes, construire_graphique, en_arriere_plan)
+
+
+def construire_graphique(selected_ville: str) -> Tuple[px.bar, html.Div]:
+    """
+    Construit le graphique et les informations associées à une ville
+
+    Args:
+        selected_ville (str): La ville sélectionnée dans le dropdown
+
+    Returns:
+        Tuple[px.bar, html.Div]: Un tuple contenant la figure  et les informations 
+    """
+    # lignes de la ville sélectionnée, via l'index du data store
+    filtered_df = get_lignes_ville(selected_ville)
 
     # trier les données par salaire médian de manière décroissante
     filtered_df = filtered_df.sort_values(by="DEC_MED18", ascending=False)
 
-    filtered_df["text_info"] = (
-        "Part chômage: "
-        + filtered_df["DEC_PCHO18"].astype(str)
-        + "%<br>"
-        + "Part non salarié: "
-        + filtered_df["DEC_PBEN18"].astype(str)
-        + "%<br>"
-        + "Part pensions/retraites: "
-        + filtered_df["DEC_PPEN18"].astype(str)
-        + "%<br>"
-    )
-
     # trouver les IRIS pour chaque critère
     iris_chomage = filtered_df.loc[filtered_df["DEC_PCHO18"].idxmax(), "LIBIRIS"]
     iris_gini = filtered_df.loc[filtered_df["DEC_GI18"].idxmax(), "LIBIRIS"]
@@ -147,7 +141,7 @@ def update_graph(selected_ville: str) -> Tuple[px.bar, html.Div]:
             "DEC_GI18": "Indice de Gini",
         },
         color_continuous_scale="Viridis", 
-        text="text_info",  
+        text="text_info",  # texte des barres calculé par le data store
     )
 
     fig.update_traces(textposition="outside")
@@ -1,8 +1,84 @@
+import threading
+from typing import Optional
 import pandas as pd
 import plotly.express as px
 from dash import html, dcc, Input, Output
 import dash_bootstrap_components as dbc
 from dash import Dash
+from src.figure_cache import FigureCache
+from src.data_store import get_agregat_ville
+
+# camemberts déjà construits, par ville sélectionnée
+cache_camemberts = FigureCache("camembert")
+
+
+def construire_camembert(selected_city: str) -> html.Div:
+    """
+    Construit le diagramme circulaire des sources de revenus d'une ville
+
+    Args:
+        selected_city (str): La ville sélectionnée (nom en minuscules)
+
+    Returns:
+        html.Div: Le graphique, ou un message si les données sont absentes ou incomplètes
+    """
+    # ligne de la ville dans la table agrégée des communes
+    city_data = get_agregat_ville(selected_city, minuscules=True)
+
+    if city_data is None:
+        return html.Div(
+            f"Aucune donnée disponible pour la ville sélectionnée : {selected_city.title()}",
+            className="text-center text-warning mt-3",
+        )
+
+    # définir les catégories et les colonnes 
+    revenue_categories = {
+        "Salaires et traitements": "DEC_PTSA18",
+        "Indemnités de chômage": "DEC_PCHO18",
+        "Activités non salariées": "DEC_PBEN18",
+        "Pensions, retraites et rentes": "DEC_PPEN18",
+        "Autres revenus": "DEC_PAUT18",
+    }
+
+    # extraire les moyennes de la ville (sur ses IRIS) pour les catégories
+    values = city_data[[f"{colonne}_moyenne" for colonne in revenue_categories.values()]]
+
+    if values.isnull().any():
+        return html.Div(
+            "Les données pour cette ville sont incompltes.",
+            className="text-center text-danger mt-3",
+        )
+
+    # créer le graphique 
+    fig = px.pie(
+        values=values,
+        names=list(revenue_categories.keys()),
+        title=f"Répartition des revenus pour {selected_city.title()}",
+        color_discrete_sequence=px.colors.sequential.Agsunset_r,
+    )
+
+    # mise en forme du graphique
+    fig.update_layout(
+        title_font=dict(size=20, family="Arial, sans-serif", color="#2c3e50"),
+        margin=dict(l=20, r=20, t=50, b=20),
+    )
+
+    return dcc.Graph(figure=fig)
+
+
+def prechauffer_camemberts(data: pd.DataFrame, en_arriere_plan: bool = True) -> Optional[threading.Thread]:
+    """
+    Construit à l'avance les diagrammes circulaires de toutes les villes
+
+    Args:
+        data (pd.DataFrame): Données filtrées contenant les informations des villes
+        en_arriere_plan (bool): Si True, construit dans un thread sans bloquer le démarrage
+
+    Returns:
+        Optional[threading.Thread]: Le thread de préchauffage, None si exécuté directement
+    """
+    villes = sorted(data["LIBCOM_normalized"].unique())
+    return cache_camemberts.prechauffer(villes, construire_camembert, en_arriere_plan)
 
 
 def create_pie_chart_component(app: Dash, data: pd.DataFrame) -> html.Div:
@@ -17,10 +93,7 @@ def create_pie_chart_component(app: Dash, data: pd.DataFrame) -> html.Div:
     Returns:
         html.Div: Un composant contenant sélecteur de ville et un graphique interactif
     """
-    # normaliser les noms des villes pour éviter les erreurs
-    data["LIBCOM_normalized"] = data["LIBCOM"].str.lower()
-
-    # liste des villes disponibles
+    # liste des villes disponibles (noms en minuscules calculés par le data store)
     villes = sorted(data["LIBCOM_normalized"].unique())
 
     # ville par défaut
@@ -79,47 +152,6 @@ def create_pie_chart_component(app: Dash, data: pd.DataFrame) -> html.Div:
                 className="text-center text-danger mt-3",
             )
 
-        # filtrer les données pour la ville sélectionnée
-        city_data = data[data["LIBCOM_normalized"] == selected_city]
-
-        if city_data.empty:
-            return html.Div(
-                f"Aucune donnée disponible pour la ville sélectionnée : {selected_city.title()}",
-                className="text-center text-warning mt-3",
-            )
-
-        # définir les catégories et les colonnes 
-        revenue_categories = {
-            "Salaires et traitements": "DEC_PTSA18",
-            "Indemnités de chômage": "DEC_PCHO18",
-            "Activités non salariées": "DEC_PBEN18",
-            "Pensions, retraites et rentes": "DEC_PPEN18",
-            "Autres revenus": "DEC_PAUT18",
-        }
-
-        # extraire les données de la ville pour les catégories
-        values = city_data[list(revenue_categories.values())].iloc[0]
-
-        if values.isnull().any():
-            return html.Div(
-                "Les données pour cette ville sont incompltes.",
-                className="text-center text-danger mt-3",
-            )
-
-        # créer le graphique 
-        fig = px.pie(
-            values=values,
-            names=list(revenue_categories.keys()),
-            title=f"Répartition des revenus pour {selected_city.title()}",
-            color_discrete_sequence=px.colors.sequential.Agsunset_r,
-        )
-
-        # mise en forme du graphique
-        fig.update_layout(
-            title_font=dict(size=20, family="Arial, sans-serif", color="#2c3e50"),
-            margin=dict(l=20, r=20, t=50, b=20),
-        )
-
-        return dcc.Graph(figure=fig)
+        return cache_camemberts.get(selected_city, lambda: construire_camembert(selected_city))
 
     return layout
@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+from typing import Optional
+from flask import Flask, Response, request
+
+from src.figure_cache import FigureCache
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : gzip seul sinon
+    brotli = None
+
+# Types de contenu compressés (JSON des callbacks et de la mise en page, page HTML, GeoJSON)
+TYPES_COMPRESSIBLES = {
+    "application/json",
+    "application/geo+json",
+    "text/html",
+    "text/css",
+    "text/javascript",
+    "application/javascript",
+}
+# En dessous de cette taille (octets), la compression ne réduit pas le transfert
+TAILLE_MIN_COMPRESSION = 500
+NIVEAU_GZIP = 6
+QUALITE_BROTLI = 5
+
+# Réponses GET sans en-tête de cache : revalidation systématique avec l'ETag (304 si inchangée)
+CACHE_CONTROL_DEFAUT = "no-cache"
+
+# corps compressés, par empreinte du contenu et encodage
+cache_compression = FigureCache("compression", taille_max=256)
+
+
+def encodages_disponibles() -> list:
+    """
+    Renvoie les encodages proposés au client, par ordre de préférence
+
+    Returns:
+        list: "br" si le module brotli est installé, puis "gzip"
+    """
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def compresser(contenu: bytes, encodage: str) -> bytes:
+    """
+    Compresse un contenu avec l'encodage demandé
+
+    Args:
+        contenu (bytes): Le contenu à compresser
+        encodage (str): "br" ou "gzip"
+
+    Returns:
+        bytes: Le contenu compressé
+    """
+    if encodage == "br":
+        return brotli.compress(contenu, quality=QUALITE_BROTLI)
+    return gzip.compress(contenu, compresslevel=NIVEAU_GZIP, mtime=0)
+
+
+def choisir_encodage() -> Optional[str]:
+    """
+    Choisit l'encodage de la réponse selon l'en-tête Accept-Encoding de la requête
+
+    Returns:
+        Optional[str]: L'encodage retenu, None si le client n'en accepte aucun
+    """
+    return request.accept_encodings.best_match(encodages_disponibles())
+
+
+def traiter_reponse(response: Response) -> Response:
+    """
+    Ajoute les validateurs de cache aux réponses GET (ETag, Cache-Control, réponse 304
+    si le client a déjà le contenu) puis compresse les réponses JSON et HTML
+
+    Args:
+        response (Response): La réponse produite par Flask ou Dash
+
+    Returns:
+        Response: La réponse, éventuellement compressée ou remplacée par un 304
+    """
+    if (response.status_code != 200 or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in TYPES_COMPRESSIBLES):
+        return response
+
+    contenu = response.get_data()
+    empreinte = hashlib.sha256(contenu).hexdigest()[:32]
+    encodage = choisir_encodage() if len(contenu) >= TAILLE_MIN_COMPRESSION else None
+    response.vary.add("Accept-Encoding")
+
+    if request.method == "GET":
+        # un ETag par représentation : le corps compressé diffère du corps brut
+        # (les scripts des composants Dash ont déjà le leur)
+        if "ETag" not in response.headers:
+            response.set_etag(f"{empreinte}-{encodage}" if encodage else empreinte)
+        if "Cache-Control" not in response.headers:
+            response.headers["Cache-Control"] = CACHE_CONTROL_DEFAUT
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+
+    if encodage:
+        response.set_data(cache_compression.get((empreinte, encodage), lambda: compresser(contenu, encodage)))
+        response.headers["Content-Encoding"] = encodage
+    return response
+
+
+def activer_compression(server: Flask) -> Flask:
+    """
+    Active la compression gzip/brotli et les en-têtes de cache sur le serveur Flask de l'application
+
+    Args:
+        server (Flask): Le serveur (app.server)
+
+    Returns:
+        Flask: Le même serveur
+    """
+    server.after_request(traiter_reponse)
+    return server
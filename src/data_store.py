@@ -0,0 +1,317 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from utils.agregats import charger_agregats
+from utils.clean_data import load_cleaned_data
+from utils.normalise_name import normalize_names
+
+# Chemins vers les fichiers de données nettoyées
+CLEANED_DATA_PATH_SALAIRE = os.path.join("data", "cleaned", "cleanedsalaire.parquet")
+CLEANED_DATA_PATH_COMMUNES_IDF = os.path.join(
+    "data", "cleaned", "cleanedcommunesiledefrance.xlsx"
+)
+
+# Données partagées par tous les composants, construites une seule fois par processus
+_verrou = threading.Lock()
+_donnees: Dict[str, pd.DataFrame] = {}
+_mesures: Dict[str, float] = {}
+_index_villes: Dict[str, Dict[str, Union[slice, np.ndarray]]] = {}
+_version: int = 0
+
+
+def charger_villes_idf(file_path: str) -> List[str]:
+    """
+    Charge la liste normalisée des communes d'Île-de-France
+
+    Args:
+        file_path (str): Chemin du fichier nettoyé des communes
+
+    Returns:
+        List[str]: Noms normalisés des communes
+    """
+    villes_idf_df = load_cleaned_data(file_path)
+    return normalize_names(villes_idf_df.iloc[:, 0]).tolist()
+
+
+def filtrer_donnees_idf(df_salaire: pd.DataFrame, villes_idf: List[str]) -> pd.DataFrame:
+    """
+    Conserve les IRIS des communes d'Île-de-France, triés par commune, en une seule copie :
+    les positions des lignes sont filtrées et triées avant d'être extraites
+
+    Args:
+        df_salaire (pd.DataFrame): Données de salaires nationales
+        villes_idf (List[str]): Noms normalisés des communes d'Île-de-France
+
+    Returns:
+        pd.DataFrame: Données filtrées sur l'Île-de-France
+    """
+    # le masque est calculé à part pour ne pas ajouter de colonne au DataFrame source
+    libcom_normalized = normalize_names(df_salaire["LIBCOM"])
+    positions = np.flatnonzero(libcom_normalized.isin(villes_idf).to_numpy())
+    # tri stable par commune, sur la seule colonne LIBCOM (codes des catégories, triées)
+    ordre = df_salaire["LIBCOM"].take(positions).argsort(kind="stable").to_numpy()
+    return df_salaire.take(positions[ordre])
+
+
+def preparer_pour_partage(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Retire les catégories inutilisées après filtrage (les libellés des autres régions)
+    et garantit qu'aucune colonne n'est de type object : le DataFrame tient alors dans
+    quelques grands tableaux numpy (un bloc par type, tels que produits par la lecture
+    Parquet et par take). Une fois chargées dans le processus maître, ces pages mémoire
+    restent partagées par les workers après le fork, car ni le ramasse-miettes ni les
+    compteurs de références ne les modifient
+
+    Args:
+        df (pd.DataFrame): Le DataFrame à préparer
+
+    Returns:
+        pd.DataFrame: Le DataFrame, dont seules les colonnes concernées sont converties
+    """
+    # dtype object au sens strict (select_dtypes inclut aussi les chaînes str de pandas 3) ;
+    # assign ne touche pas aux blocs numériques, contrairement à astype
+    conversions = {
+        colonne: df[colonne].astype("category")
+        for colonne in df.columns
+        if df[colonne].dtype == object
+    }
+    conversions.update({
+        colonne: df[colonne].cat.remove_unused_categories()
+        for colonne in df.select_dtypes(include="category").columns
+    })
+    if conversions:
+        df = df.assign(**conversions)
+    return df
+
+
+def colonnes_derivees(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    """
+    Calcule une fois pour toutes les colonnes dérivées utilisées par les composants,
+    qui n'ont ainsi plus à modifier les données partagées :
+    nom de commune en minuscules et texte des barres
+
+    Args:
+        df (pd.DataFrame): Données filtrées sur l'Île-de-France
+
+    Returns:
+        Dict[str, pd.Series]: Les colonnes dérivées, par nom
+    """
+    return {
+        "LIBCOM_normalized": df["LIBCOM"].str.lower().astype("category"),
+        "text_info": (
+            "Part chômage: " + df["DEC_PCHO18"].astype(str) + "%<br>"
+            + "Part non salarié: " + df["DEC_PBEN18"].astype(str) + "%<br>"
+            + "Part pensions/retraites: " + df["DEC_PPEN18"].astype(str) + "%<br>"
+        ),
+    }
+
+
+def verrouiller(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reconstruit le DataFrame partagé sur des tableaux numpy non modifiables : une écriture
+    en place lève une erreur au lieu de modifier silencieusement les données de tous les
+    composants. Les colonnes numpy de même type sont regroupées dans un tableau 2D, marqué
+    en lecture seule avant la construction du DataFrame : celui-ci garde un bloc par type,
+    comme à la sortie de preparer_pour_partage
+
+    Args:
+        df (pd.DataFrame): Le DataFrame partagé
+
+    Returns:
+        pd.DataFrame: Un DataFrame aux mêmes colonnes, dont les tableaux numpy sont en lecture seule
+    """
+    colonnes_par_type: Dict[np.dtype, List[str]] = {}
+    for colonne in df.columns:
+        if isinstance(df[colonne].dtype, np.dtype):
+            colonnes_par_type.setdefault(df[colonne].dtype, []).append(colonne)
+
+    parties = []
+    for colonnes in colonnes_par_type.values():
+        # une ligne par colonne : la transposée donne à pandas un bloc contigu par colonne
+        valeurs = np.stack([df[colonne].to_numpy() for colonne in colonnes])
+        valeurs.flags.writeable = False
+        parties.append(pd.DataFrame(valeurs.T, index=df.index, columns=colonnes, copy=False))
+    colonnes_numpy = {colonne for colonnes in colonnes_par_type.values() for colonne in colonnes}
+    parties.append(df[[colonne for colonne in df.columns if colonne not in colonnes_numpy]])
+    return pd.concat(parties, axis=1)[list(df.columns)]
+
+
+def construire_index_villes(villes: pd.Series) -> Dict[str, Union[slice, np.ndarray]]:
+    """
+    Construit l'index ville -> lignes d'un DataFrame : une tranche quand les lignes
+    de la ville sont contiguës (données triées par commune), sinon leurs positions
+
+    Args:
+        villes (pd.Series): Colonne des noms de villes
+
+    Returns:
+        Dict[str, Union[slice, np.ndarray]]: Lignes de chaque ville, utilisables avec .iloc
+    """
+    index: Dict[str, Union[slice, np.ndarray]] = {}
+    for ville, positions in villes.groupby(villes.to_numpy(), sort=False).indices.items():
+        debut, fin = positions[0], positions[-1] + 1
+        index[ville] = slice(debut, fin) if fin - debut == len(positions) else positions
+    return index
+
+
+def _charger() -> None:
+    """
+    Charge les fichiers nettoyés et construit le DataFrame filtré en mesurant chaque étape
+    """
+    global _version
+
+    debut = time.perf_counter()
+    df_salaire = load_cleaned_data(CLEANED_DATA_PATH_SALAIRE)
+    _mesures["chargement_salaires_s"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    villes_idf = charger_villes_idf(CLEANED_DATA_PATH_COMMUNES_IDF)
+    _mesures["chargement_communes_s"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    df_filtre_idf = filtrer_donnees_idf(df_salaire, villes_idf)
+    df_filtre_idf = preparer_pour_partage(df_filtre_idf.assign(**colonnes_derivees(df_filtre_idf)))
+    _mesures["filtrage_s"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    _index_villes["LIBCOM"] = construire_index_villes(df_filtre_idf["LIBCOM"])
+    _index_villes["minuscules"] = construire_index_villes(df_filtre_idf["LIBCOM_normalized"])
+    _mesures["index_villes_s"] = time.perf_counter() - debut
+
+    df_filtre_idf = verrouiller(df_filtre_idf)
+    _donnees["df_filtre_idf"] = df_filtre_idf
+    _mesures["memoire_mo"] = df_filtre_idf.memory_usage(deep=True).sum() / 1024**2
+    _mesures["lignes"] = float(len(df_filtre_idf))
+    _version += 1
+    afficher_rapport()
+
+
+def get_df_filtre_idf() -> pd.DataFrame:
+    """
+    Renvoie les données de salaires filtrées sur l'Île-de-France, avec leurs colonnes
+    dérivées, chargées au premier appel puis partagées par tout le processus.
+    L'appelant reçoit une vue en lecture seule : les tableaux ne sont pas copiés, et une
+    colonne ajoutée à la vue n'apparaît pas dans les données partagées
+
+    Returns:
+        pd.DataFrame: Données filtrées sur l'Île-de-France
+    """
+    if "df_filtre_idf" not in _donnees:
+        with _verrou:
+            if "df_filtre_idf" not in _donnees:
+                _charger()
+    return _donnees["df_filtre_idf"].copy(deep=False)
+
+
+def get_lignes_ville(ville: str, minuscules: bool = False) -> pd.DataFrame:
+    """
+    Renvoie les IRIS d'une ville sans parcourir tout le DataFrame :
+    le coût est proportionnel au nombre de lignes de la ville
+
+    Args:
+        ville (str): Nom de la ville (colonne LIBCOM)
+        minuscules (bool): Si True, le nom est cherché en minuscules
+
+    Returns:
+        pd.DataFrame: Les lignes de la ville (vide si la ville est inconnue)
+    """
+    df_filtre_idf = get_df_filtre_idf()
+    lignes = _index_villes["minuscules" if minuscules else "LIBCOM"].get(ville)
+    if lignes is None:
+        return df_filtre_idf.iloc[0:0]
+    return df_filtre_idf.iloc[lignes]
+
+
+def get_agregats(niveau: str) -> pd.DataFrame:
+    """
+    Renvoie la table agrégée d'un niveau (commune, département ou région),
+    chargée au premier appel puis partagée par tout le processus
+
+    Args:
+        niveau (str): "commune", "departement" ou "region"
+
+    Returns:
+        pd.DataFrame: La table agrégée
+    """
+    cle = f"agregats_{niveau}"
+    if cle not in _donnees:
+        with _verrou:
+            if cle not in _donnees:
+                agregats = charger_agregats(niveau)
+                if niveau == "commune":
+                    # index par code commune, construit une fois pour les recherches de get_agregat_ville
+                    _donnees["agregats_commune_par_code"] = (
+                        agregats.drop_duplicates("COM").set_index("COM", drop=False)
+                    )
+                _donnees[cle] = agregats
+    return _donnees[cle]
+
+
+def get_agregat_ville(ville: str, minuscules: bool = False) -> Optional[pd.Series]:
+    """
+    Renvoie la ligne agrégée d'une ville d'Île-de-France, retrouvée par son code commune
+    (les homonymes d'autres régions sont ainsi écartés)
+
+    Args:
+        ville (str): Nom de la ville (colonne LIBCOM)
+        minuscules (bool): Si True, le nom est cherché en minuscules
+
+    Returns:
+        Optional[pd.Series]: La ligne de la table des communes, None si la ville est inconnue
+    """
+    lignes = get_lignes_ville(ville, minuscules=minuscules)
+    if lignes.empty:
+        return None
+    get_agregats("commune")
+    communes = _donnees["agregats_commune_par_code"]
+    code = str(lignes["COM"].iloc[0])
+    return communes.loc[code] if code in communes.index else None
+
+
+def get_version() -> int:
+    """
+    Renvoie la version des données chargées (incrémentée à chaque chargement)
+
+    Returns:
+        int: La version courante, 0 si rien n'est chargé
+    """
+    return _version
+
+
+def reinitialiser() -> None:
+    """
+    Oublie les données chargées : le prochain accès relit les fichiers nettoyés
+    """
+    with _verrou:
+        _donnees.clear()
+        _mesures.clear()
+        _index_villes.clear()
+
+
+def get_rapport() -> Dict[str, Any]:
+    """
+    Renvoie les temps de chargement et l'empreinte mémoire des données
+
+    Returns:
+        Dict[str, Any]: Mesures du dernier chargement
+    """
+    return dict(_mesures, version=_version)
+
+
+def afficher_rapport() -> None:
+    """
+    Affiche les temps de chargement et l'empreinte mémoire des données
+    """
+    print(
+        "Données chargées : "
+        f"salaires {_mesures.get('chargement_salaires_s', 0):.3f} s, "
+        f"communes {_mesures.get('chargement_communes_s', 0):.3f} s, "
+        f"filtrage {_mesures.get('filtrage_s', 0):.3f} s, "
+        f"index des villes {_mesures.get('index_villes_s', 0):.3f} s, "
+        f"{int(_mesures.get('lignes', 0))} lignes, "
+        f"{_mesures.get('memoire_mo', 0):.2f} Mo en mémoire"
+    )
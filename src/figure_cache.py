@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from src.data_store import get_version
+
+
+class FigureCache:
+    """
+    Cache LRU de taille bornée pour les figures construites par les callbacks.
+    Les entrées sont invalidées dès que la version du data store change
+    """
+
+    def __init__(self, nom: str, taille_max: int = 1024) -> None:
+        """
+        Args:
+            nom (str): Nom du cache (pour les statistiques)
+            taille_max (int): Nombre maximal d'entrées conservées
+        """
+        self.nom = nom
+        self.taille_max = taille_max
+        self.entrees: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.version: Optional[int] = None
+        self.succes = 0
+        self.echecs = 0
+        self.verrou = threading.Lock()
+
+    def get(self, cle: Hashable, construire: Callable[[], Any], compter: bool = True) -> Any:
+        """
+        Renvoie la valeur en cache pour une clé, ou la construit et la mémorise
+
+        Args:
+            cle (Hashable): Clé de la figure (ex. la ville sélectionnée)
+            construire (Callable[[], Any]): Fonction construisant la valeur si elle est absente
+            compter (bool): Si False, l'accès n'entre pas dans les statistiques (préchauffage)
+
+        Returns:
+            Any: La valeur en cache ou nouvellement construite
+        """
+        version = get_version()
+        with self.verrou:
+            if version != self.version:
+                self.entrees.clear()
+                self.version = version
+            if cle in self.entrees:
+                self.succes += compter
+                self.entrees.move_to_end(cle)
+                return self.entrees[cle]
+            self.echecs += compter
+
+        # construction hors verrou : les autres clés restent servies pendant ce temps
+        valeur = construire()
+        with self.verrou:
+            if version == self.version:
+                self.entrees[cle] = valeur
+                self.entrees.move_to_end(cle)
+                while len(self.entrees) > self.taille_max:
+                    self.entrees.popitem(last=False)
+        return valeur
+
+    def vider(self) -> None:
+        """
+        Supprime toutes les entrées et remet les statistiques à zéro
+        """
+        with self.verrou:
+            self.entrees.clear()
+            self.succes = 0
+            self.echecs = 0
+
+    def prechauffer(self, cles: Iterable[Hashable], construire: Callable[[Hashable], Any],
+                    en_arriere_plan: bool = True) -> Optional[threading.Thread]:
+        """
+        Construit à l'avance les valeurs d'une liste de clés
+
+        Args:
+            cles (Iterable[Hashable]): Clés à préparer
+            construire (Callable[[Hashable], Any]): Fonction construisant la valeur d'une clé
+            en_arriere_plan (bool): Si True, construit dans un thread sans bloquer le démarrage
+
+        Returns:
+            Optional[threading.Thread]: Le thread de préchauffage, None si exécuté directement
+        """
+        def executer() -> None:
+            for cle in list(cles)[: self.taille_max]:
+                self.get(cle, lambda cle=cle: construire(cle), compter=False)
+
+        if not en_arriere_plan:
+            executer()
+            return None
+
+        thread = threading.Thread(target=executer, name=f"prechauffage-{self.nom}", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Renvoie les statistiques d'utilisation du cache
+
+        Returns:
+            Dict[str, Any]: Succès, échecs, taux de succès, nombre d'entrées et version des données
+        """
+        with self.verrou:
+            total = self.succes + self.echecs
+            return {
+                "nom": self.nom,
+                "succes": self.succes,
+                "echecs": self.echecs,
+                "taux_succes": self.succes / total if total else 0.0,
+                "entrees": len(self.entrees),
+                "taille_max": self.taille_max,
+                "version_donnees": self.version,
+            }
@@ -0,0 +1,148 @@
+import glob
+import hashlib
+import inspect
+import json
+import os
+import sys
+from typing import Any, Callable, Dict
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from src import binning
+from src.components.heatmap_chomage import figure_heatmap_chomage
+from src.components.heatmap_retraite import figure_heatmap_retraite
+from src.components.heatmap_revenu_non_activite import figure_heatmap_revenu_non_salarie
+from src.components.histogram import figure_histogram
+from src.components.histogram_salary_range import figure_histogram_by_salary_range
+
+# Artefacts JSON des figures statiques : <nom>-<empreinte>.json
+DOSSIER_FIGURES = os.path.join("data", "figures")
+# Index nom -> artefact courant, sortie de l'étape du pipeline
+INDEX_FIGURES = os.path.join(DOSSIER_FIGURES, "index.json")
+
+# Figures qui ne dépendent que des données filtrées sur l'Île-de-France
+FIGURES_STATIQUES: Dict[str, Callable[[pd.DataFrame], Any]] = {
+    "histogramme": figure_histogram,
+    "histogramme_intervalles": figure_histogram_by_salary_range,
+    "heatmap_chomage": figure_heatmap_chomage,
+    "heatmap_retraite": figure_heatmap_retraite,
+    "heatmap_revenu_non_salarie": figure_heatmap_revenu_non_salarie,
+}
+
+# Colonnes lues par ces figures : seules elles entrent dans l'empreinte des données
+COLONNES_FIGURES = ["DEC_MED18", "DEC_PCHO18", "DEC_PPEN18", "DEC_PAUT18"]
+
+
+def empreinte_figure(nom: str, df: pd.DataFrame) -> str:
+    """
+    Calcule l'empreinte d'une figure statique : hash des colonnes utilisées, du code
+    du module qui la construit, du moteur d'intervalles et de ce module (allègement du
+    template) : les modifier invalide l'artefact
+
+    Args:
+        nom (str): Nom de la figure
+        df (pd.DataFrame): Données de la figure
+
+    Returns:
+        str: L'empreinte (16 caractères hexadécimaux)
+    """
+    sha256 = hashlib.sha256(pd.util.hash_pandas_object(df[COLONNES_FIGURES], index=False).to_numpy().tobytes())
+    sha256.update(inspect.getsource(inspect.getmodule(FIGURES_STATIQUES[nom])).encode("utf-8"))
+    sha256.update(inspect.getsource(binning).encode("utf-8"))
+    sha256.update(inspect.getsource(sys.modules[__name__]).encode("utf-8"))
+    return sha256.hexdigest()[:16]
+
+
+def alleger_template(fig: go.Figure) -> go.Figure:
+    """
+    Réduit le template de la figure aux types de traces qu'elle contient : le template
+    par défaut décrit tous les types de graphiques et représente l'essentiel du JSON,
+    alors que le rendu ne dépend que des types présents
+
+    Args:
+        fig (go.Figure): La figure, modifiée en place
+
+    Returns:
+        go.Figure: La même figure
+    """
+    template = fig.layout.template
+    types = {trace.type for trace in fig.data}
+    fig.layout.template = go.layout.Template(
+        layout=template.layout,
+        data={type_trace: getattr(template.data, type_trace) for type_trace in types},
+    )
+    return fig
+
+
+def chemin_artefact(nom: str, empreinte: str) -> str:
+    """
+    Calcule l'emplacement de l'artefact d'une figure
+
+    Args:
+        nom (str): Nom de la figure
+        empreinte (str): Empreinte des données et du code
+
+    Returns:
+        str: Chemin du fichier JSON
+    """
+    return os.path.join(DOSSIER_FIGURES, f"{nom}-{empreinte}.json")
+
+
+def prerendre_figures(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    Construit toutes les figures statiques et les écrit en JSON compact, avec leur index ;
+    les artefacts périmés de chaque figure sont supprimés
+
+    Args:
+        df (pd.DataFrame): Données filtrées sur l'Île-de-France
+
+    Returns:
+        Dict[str, str]: Chemin de l'artefact de chaque figure
+    """
+    os.makedirs(DOSSIER_FIGURES, exist_ok=True)
+    chemins = {}
+    for nom, construire in FIGURES_STATIQUES.items():
+        chemin = chemin_artefact(nom, empreinte_figure(nom, df))
+        contenu = pio.to_json(alleger_template(construire(df)), validate=False, pretty=False)
+        temporaire = f"{chemin}.{os.getpid()}.tmp"
+        with open(temporaire, "w", encoding="utf-8") as file:
+            file.write(contenu)
+        os.replace(temporaire, chemin)
+
+        for ancien in glob.glob(os.path.join(DOSSIER_FIGURES, f"{nom}-*.json")):
+            if ancien != chemin:
+                os.remove(ancien)
+        print(f"Figure {nom} : {len(contenu) / 1024:.0f} Ko -> {chemin}")
+        chemins[nom] = chemin
+
+    with open(INDEX_FIGURES, "w", encoding="utf-8") as file:
+        json.dump(chemins, file, ensure_ascii=False, indent=2)
+    return chemins
+
+
+def charger_figure(nom: str, df: pd.DataFrame) -> Any:
+    """
+    Renvoie la figure statique depuis son artefact s'il correspond aux données,
+    sinon la construit (sans l'écrire : c'est le rôle de la commande de pré-rendu)
+
+    Args:
+        nom (str): Nom de la figure
+        df (pd.DataFrame): Données filtrées sur l'Île-de-France
+
+    Returns:
+        Any: Le dictionnaire JSON de la figure, ou la figure Plotly construite
+    """
+    chemin = chemin_artefact(nom, empreinte_figure(nom, df))
+    if os.path.isfile(chemin):
+        with open(chemin, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    print(f"Figure {nom} : pas d'artefact pré-rendu, construction ({chemin} absent)")
+    return alleger_template(FIGURES_STATIQUES[nom](df))
+
+
+if __name__ == "__main__":
+    from src.data_store import get_df_filtre_idf
+
+    prerendre_figures(get_df_filtre_idf())
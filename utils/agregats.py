@@ -0,0 +1,192 @@
+import os
+import sys
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+from utils.chemins import CHEMINS_AGREGATS, NIVEAUX  # noqa: F401 (réexportés)
+from utils.clean_data import CLEANED_DATA_PATH_SALAIRE, load_cleaned_data
+
+# Indicateurs agrégés : salaire médian, Gini et parts des sources de revenus
+INDICATEURS = [
+    "DEC_MED18",
+    "DEC_GI18",
+    "DEC_PTSA18",
+    "DEC_PCHO18",
+    "DEC_PBEN18",
+    "DEC_PPEN18",
+    "DEC_PAUT18",
+]
+
+# Départements de chaque région (codes INSEE des régions depuis 2016)
+REGIONS_DEPARTEMENTS = {
+    "01": ["971"],
+    "02": ["972"],
+    "03": ["973"],
+    "04": ["974"],
+    "06": ["976"],
+    "11": ["75", "77", "78", "91", "92", "93", "94", "95"],
+    "24": ["18", "28", "36", "37", "41", "45"],
+    "27": ["21", "25", "39", "58", "70", "71", "89", "90"],
+    "28": ["14", "27", "50", "61", "76"],
+    "32": ["02", "59", "60", "62", "80"],
+    "44": ["08", "10", "51", "52", "54", "55", "57", "67", "68", "88"],
+    "52": ["44", "49", "53", "72", "85"],
+    "53": ["22", "29", "35", "56"],
+    "75": ["16", "17", "19", "23", "24", "33", "40", "47", "64", "79", "86", "87"],
+    "76": ["09", "11", "12", "30", "31", "32", "34", "46", "48", "65", "66", "81", "82"],
+    "84": ["01", "03", "07", "15", "26", "38", "42", "43", "63", "69", "73", "74"],
+    "93": ["04", "05", "06", "13", "83", "84"],
+    "94": ["2A", "2B"],
+}
+DEPARTEMENT_REGION = {
+    departement: region
+    for region, departements in REGIONS_DEPARTEMENTS.items()
+    for departement in departements
+}
+
+
+def codes_departements(codes_communes: pd.Series) -> pd.Series:
+    """
+    Déduit le code département du code commune (3 caractères en outre-mer)
+
+    Args:
+        codes_communes (pd.Series): Codes INSEE des communes
+
+    Returns:
+        pd.Series: Codes des départements
+    """
+    codes = codes_communes.astype(str)
+    return codes.str[:2].where(~codes.str.startswith("97"), codes.str[:3])
+
+
+def mediane_ponderee(df: pd.DataFrame, cle: str, colonne: str, poids: str) -> pd.Series:
+    """
+    Calcule la médiane pondérée d'une colonne pour chaque groupe, sans boucle Python :
+    première valeur (dans l'ordre croissant) dont le poids cumulé atteint la moitié du total
+
+    Args:
+        df (pd.DataFrame): Les données
+        cle (str): Colonne des groupes
+        colonne (str): Colonne des valeurs
+        poids (str): Colonne des poids
+
+    Returns:
+        pd.Series: Médiane pondérée de chaque groupe, indexée par la clé
+    """
+    valides = df.loc[df[colonne].notna(), [cle, colonne, poids]].sort_values([cle, colonne])
+    cumul = valides.groupby(cle, observed=True)[poids].cumsum()
+    total = valides.groupby(cle, observed=True)[poids].transform("sum")
+    atteinte = valides[cumul >= total / 2]
+    return atteinte.groupby(cle, observed=True)[colonne].first()
+
+
+def agreger_iris(df_iris: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrège les IRIS par commune : nombre d'IRIS, moyenne, médiane, minimum et maximum
+    de chaque indicateur
+
+    Args:
+        df_iris (pd.DataFrame): Données nettoyées des salaires, une ligne par IRIS
+
+    Returns:
+        pd.DataFrame: Une ligne par commune
+    """
+    # calculs en float64 : le schéma des salaires stocke les indicateurs en int32 et float32
+    df_iris = df_iris.astype({indicateur: "float64" for indicateur in INDICATEURS})
+    groupes = df_iris.groupby("COM", observed=True, sort=True)
+    communes = groupes[INDICATEURS].agg(["mean", "median", "min", "max"])
+    communes.columns = [
+        f"{indicateur}_{nom}"
+        for indicateur, stat in communes.columns
+        for nom in [{"mean": "moyenne", "median": "mediane", "min": "min", "max": "max"}[stat]]
+    ]
+    communes.insert(0, "nb_iris", groupes.size())
+    communes.insert(0, "LIBCOM", groupes["LIBCOM"].first().astype(str))
+    communes = communes.reset_index()
+    communes["COM"] = communes["COM"].astype(str)
+    communes.insert(2, "DEP", codes_departements(communes["COM"]))
+    communes.insert(3, "REG", communes["DEP"].map(DEPARTEMENT_REGION))
+    return communes
+
+
+def agreger_niveau(df: pd.DataFrame, cle: str, colonnes_cles: List[str]) -> pd.DataFrame:
+    """
+    Agrège un niveau de la hiérarchie vers le niveau supérieur à partir de ses propres agrégats :
+    moyennes pondérées et médianes pondérées par le nombre d'IRIS, minimum des minimums
+    et maximum des maximums
+
+    Args:
+        df (pd.DataFrame): Table agrégée du niveau inférieur
+        cle (str): Colonne du niveau supérieur ("DEP" ou "REG")
+        colonnes_cles (List[str]): Colonnes d'identification conservées (première valeur du groupe)
+
+    Returns:
+        pd.DataFrame: Une ligne par groupe du niveau supérieur
+    """
+    df = df[df[cle].notna()]
+    groupes = df.groupby(cle, sort=True)
+    resultat = groupes[colonnes_cles].first() if colonnes_cles else pd.DataFrame(index=groupes.size().index)
+    resultat[f"nb_{'communes' if cle == 'DEP' else 'departements'}"] = groupes.size()
+    resultat["nb_iris"] = groupes["nb_iris"].sum()
+
+    for indicateur in INDICATEURS:
+        moyenne = f"{indicateur}_moyenne"
+        # une moyenne d'IRIS pondérée par le nombre d'IRIS redonne la moyenne sur tous les IRIS
+        somme = (df[moyenne] * df["nb_iris"]).groupby(df[cle]).sum(min_count=1)
+        poids = df["nb_iris"].where(df[moyenne].notna()).groupby(df[cle]).sum()
+        resultat[moyenne] = somme / poids.replace(0, np.nan)
+        resultat[f"{indicateur}_mediane"] = mediane_ponderee(df, cle, f"{indicateur}_mediane", "nb_iris")
+        resultat[f"{indicateur}_min"] = groupes[f"{indicateur}_min"].min()
+        resultat[f"{indicateur}_max"] = groupes[f"{indicateur}_max"].max()
+    return resultat.reset_index()
+
+
+def construire_agregats(df_iris: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Construit toute la hiérarchie des tables agrégées
+
+    Args:
+        df_iris (pd.DataFrame): Données nettoyées des salaires, une ligne par IRIS
+
+    Returns:
+        Dict[str, pd.DataFrame]: Table de chaque niveau ("commune", "departement", "region")
+    """
+    communes = agreger_iris(df_iris)
+    departements = agreger_niveau(communes, "DEP", ["REG"])
+    regions = agreger_niveau(departements, "REG", [])
+    return {"commune": communes, "departement": departements, "region": regions}
+
+
+def charger_agregats(niveau: str) -> pd.DataFrame:
+    """
+    Charge la table agrégée d'un niveau
+
+    Args:
+        niveau (str): "commune", "departement" ou "region"
+
+    Returns:
+        pd.DataFrame: La table agrégée
+    """
+    if niveau not in CHEMINS_AGREGATS:
+        raise ValueError(f"Niveau d'agrégation inconnu : {niveau} (attendu : {', '.join(NIVEAUX)})")
+    return load_cleaned_data(CHEMINS_AGREGATS[niveau])
+
+
+def generer_agregats(fichier_salaire: str = CLEANED_DATA_PATH_SALAIRE) -> None:
+    """
+    Construit et sauvegarde au format Parquet les tables agrégées de tous les niveaux
+
+    Args:
+        fichier_salaire (str): Chemin du fichier nettoyé des salaires
+    """
+    tables = construire_agregats(load_cleaned_data(fichier_salaire))
+    for niveau, table in tables.items():
+        chemin = CHEMINS_AGREGATS[niveau]
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        table.to_parquet(chemin, index=False)
+        print(f"Table agrégée {niveau} : {len(table)} lignes -> {chemin}")
+
+
+if __name__ == "__main__":
+    generer_agregats(sys.argv[1] if len(sys.argv) > 1 else CLEANED_DATA_PATH_SALAIRE)
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.normalise_name import normalize_name
+
+# Cache persistant des coordonnées, indexé par nom de commune normalisé
+CHEMIN_CACHE = os.path.join("data", "cache", "geocodage.sqlite")
+# Les coordonnées d'une commune ne changent quasiment jamais
+DUREE_VALIDITE = 365 * 24 * 3600
+# Une commune introuvable est redemandée plus tôt (correction possible côté API)
+DUREE_VALIDITE_ABSENTE = 7 * 24 * 3600
+
+Coordonnees = Tuple[Optional[float], Optional[float]]
+
+
+def ouvrir_cache(file_path: str = CHEMIN_CACHE) -> sqlite3.Connection:
+    """
+    Ouvre (et crée si besoin) la base SQLite du cache de géocodage
+
+    Args:
+        file_path (str): Chemin de la base SQLite
+
+    Returns:
+        sqlite3.Connection: La connexion à la base
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    conn = sqlite3.connect(file_path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS geocodage (
+            cle TEXT PRIMARY KEY,
+            ville TEXT NOT NULL,
+            latitude REAL,
+            longitude REAL,
+            horodatage REAL NOT NULL,
+            absente INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    return conn
+
+
+def lire_cache(conn: sqlite3.Connection, villes: List[str],
+               maintenant: Optional[float] = None) -> Tuple[Dict[str, Coordonnees], List[str], Dict[str, int]]:
+    """
+    Cherche les villes dans le cache et sépare celles à géocoder
+
+    Args:
+        conn (sqlite3.Connection): Connexion au cache
+        villes (List[str]): Noms des villes recherchées
+        maintenant (Optional[float]): Horodatage de référence (time.time() par défaut)
+
+    Returns:
+        Tuple: Coordonnées trouvées par ville, villes à géocoder (inconnues ou expirées)
+        et statistiques ("succes", "absentes", "inconnues", "expirees")
+    """
+    maintenant = time.time() if maintenant is None else maintenant
+    stats = {"succes": 0, "absentes": 0, "inconnues": 0, "expirees": 0}
+    trouvees: Dict[str, Coordonnees] = {}
+    a_geocoder: List[str] = []
+
+    for ville in villes:
+        ligne = conn.execute(
+            "SELECT latitude, longitude, horodatage, absente FROM geocodage WHERE cle = ?",
+            (normalize_name(ville),),
+        ).fetchone()
+        if ligne is None:
+            stats["inconnues"] += 1
+            a_geocoder.append(ville)
+            continue
+
+        latitude, longitude, horodatage, absente = ligne
+        validite = DUREE_VALIDITE_ABSENTE if absente else DUREE_VALIDITE
+        if maintenant - horodatage > validite:
+            stats["expirees"] += 1
+            a_geocoder.append(ville)
+        else:
+            stats["absentes" if absente else "succes"] += 1
+            trouvees[ville] = (latitude, longitude)
+
+    return trouvees, a_geocoder, stats
+
+
+def ecrire_cache(conn: sqlite3.Connection, resultats: List[Tuple[str, Optional[float], Optional[float]]],
+                 echecs: Optional[List[str]] = None, maintenant: Optional[float] = None) -> None:
+    """
+    Enregistre les résultats du géocodage ; une ville sans résultat est marquée absente,
+    sauf si sa requête a échoué (elle sera redemandée au prochain passage)
+
+    Args:
+        conn (sqlite3.Connection): Connexion au cache
+        resultats (List[Tuple]): Nom, latitude et longitude de chaque ville géocodée
+        echecs (Optional[List[str]]): Villes dont la requête a échoué
+        maintenant (Optional[float]): Horodatage de la réponse (time.time() par défaut)
+    """
+    maintenant = time.time() if maintenant is None else maintenant
+    echecs_set = set(echecs or [])
+    lignes = [
+        (normalize_name(ville), ville, latitude, longitude, maintenant, int(latitude is None))
+        for ville, latitude, longitude in resultats
+        if ville not in echecs_set
+    ]
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO geocodage VALUES (?, ?, ?, ?, ?, ?)", lignes)
+
+
+def afficher_stats(stats: Dict[str, int]) -> None:
+    """
+    Affiche les statistiques d'utilisation du cache
+
+    Args:
+        stats (Dict[str, int]): Statistiques renvoyées par lire_cache
+    """
+    total = sum(stats.values())
+    touches = stats["succes"] + stats["absentes"]
+    taux = 100 * touches / total if total else 0.0
+    print(
+        f"Cache de géocodage : {touches}/{total} trouvées ({taux:.1f} %) dont "
+        f"{stats['absentes']} marquées absentes, {stats['inconnues']} inconnues, "
+        f"{stats['expirees']} expirées"
+    )
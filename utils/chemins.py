@@ -0,0 +1,29 @@
+import os
+
+# Chemins des fichiers de données, sans dépendance lourde : le pipeline les lit à l'import
+# sans charger pandas ni openpyxl (les modules de traitement les réexportent)
+
+# Chemins des fichiers bruts
+RAW_DATA_PATH_ELECTION = os.path.join("data/raw", "rawdataelection.xlsx")
+RAW_DATA_PATH_SALAIRE = os.path.join("data/raw", "rawdatasalaire.xlsx")
+RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE = os.path.join(
+    "data/raw", "rawdatacommunesiledefrance.csv"
+)
+
+# Chemins des fichiers nettoyés
+CLEANED_DATA_PATH_SALAIRE = os.path.join("data/cleaned", "cleanedsalaire.parquet")
+# Export Excel facultatif, uniquement pour consultation
+CLEANED_DATA_PATH_SALAIRE_EXCEL = os.path.join("data/cleaned", "cleanedsalaire.xlsx")
+CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE = os.path.join(
+    "data/cleaned", "cleanedcommunesiledefrance.xlsx"
+)
+
+# Tables agrégées, une par niveau de la hiérarchie IRIS -> commune -> département -> région
+NIVEAUX = ["commune", "departement", "region"]
+CHEMINS_AGREGATS = {
+    niveau: os.path.join("data", "cleaned", f"agregats_{niveau}.parquet") for niveau in NIVEAUX
+}
+
+# Écrire aussi la version TopoJSON du GeoJSON des communes (DASHBOARD_TOPOJSON=1) : lu ici
+# pour que le pipeline en tienne compte sans importer get_geojson
+GENERER_TOPOJSON = os.environ.get("DASHBOARD_TOPOJSON", "0") == "1"
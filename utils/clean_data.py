@@ -1,19 +1,46 @@
 import os
+import csv
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
 import pandas as pd
+from openpyxl import load_workbook
 
-
-# Chemins des fichiers bruts
-RAW_DATA_PATH_ELECTION = os.path.join("data/raw", "rawdataelection.xlsx")
-RAW_DATA_PATH_SALAIRE = os.path.join("data/raw", "rawdatasalaire.xlsx")
-RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE = os.path.join(
-    "data/raw", "rawdatacommunesiledefrance.csv"
+from utils.chemins import (  # noqa: F401 (réexportés)
+    CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
+    CLEANED_DATA_PATH_SALAIRE,
+    CLEANED_DATA_PATH_SALAIRE_EXCEL,
+    RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
+    RAW_DATA_PATH_ELECTION,
+    RAW_DATA_PATH_SALAIRE,
 )
+from utils.normalise_name import normalize_name
 
-# Chemins des fichiers nettoyés
-CLEANED_DATA_PATH_SALAIRE = os.path.join("data/cleaned", "cleanedsalaire.xlsx")
-CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE = os.path.join(
-    "data/cleaned", "cleanedcommunesiledefrance.xlsx"
-)
+# Colonnes de libellés stockées en catégories (beaucoup de répétitions)
+COLONNES_CATEGORIELLES_SALAIRE = ["LIBCOM", "LIBIRIS"]
+# Colonnes de codes conservées en chaînes (zéros initiaux, codes corses 2A/2B)
+COLONNES_CODES_SALAIRE = ["IRIS", "COM"]
+# Indicateurs en euros, entiers dans le fichier source : quartiles, médiane et déciles
+COLONNES_MONTANTS_SALAIRE = [
+    "DEC_Q118", "DEC_MED18", "DEC_Q318",
+    "DEC_D118", "DEC_D218", "DEC_D318", "DEC_D418", "DEC_D618", "DEC_D718", "DEC_D818", "DEC_D918",
+]
+
+# Types déclarés des colonnes des salaires, appliqués après suppression des lignes incomplètes
+# (d'où des entiers non nullables). Le code commune, répété sur chaque IRIS, est une catégorie
+# (codes entiers sous-jacents) ; les autres indicateurs DEC_*18 (parts en %, ratios, Gini)
+# sont en TYPE_INDICATEURS_SALAIRE
+TYPES_SALAIRE: Dict[str, str] = {
+    **{col: "category" for col in COLONNES_CATEGORIELLES_SALAIRE},
+    "COM": "category",
+    "IRIS": "str",
+    **{col: "int32" for col in COLONNES_MONTANTS_SALAIRE},
+    "DEC_NOTE18": "int8",
+}
+TYPE_INDICATEURS_SALAIRE = "float32"
+
+# Départements d'Île-de-France, pour le filtrage régional en lecture continue
+DEPARTEMENTS_IDF = {"75", "77", "78", "91", "92", "93", "94", "95"}
+
+Ligne = Dict[str, Any]
 
 
 def check_file_exists(file_path: str) -> bool:
@@ -72,6 +99,137 @@ def load_data(file_path: str, skip_rows: int = 0, xlsx: bool = False) -> pd.Data
     return df
 
 
+def iterer_lignes(file_path: str, skip_rows: int = 0, xlsx: bool = True) -> Iterator[Ligne]:
+    """
+    Lit un fichier Excel ou CSV ligne par ligne, sans le charger entièrement en mémoire
+    (mode lecture seule d'openpyxl pour l'Excel)
+
+    Args:
+        file_path (str): Le chemin du fichier à lire
+        skip_rows (int): Nombre de lignes à sauter avant la ligne d'en-tête
+        xlsx (bool): Si True, lit un fichier Excel, sinon un CSV séparé par des points-virgules
+
+    Yields:
+        Ligne: Chaque ligne sous forme de dictionnaire colonne -> valeur
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
+
+    if xlsx:
+        classeur = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            lignes = classeur.active.iter_rows(values_only=True)
+            yield from _lignes_en_dictionnaires(lignes, skip_rows)
+        finally:
+            classeur.close()
+    else:
+        with open(file_path, "r", encoding="utf-8", newline="") as file:
+            yield from _lignes_en_dictionnaires(csv.reader(file, delimiter=";", quotechar='"'), skip_rows)
+
+
+def _lignes_en_dictionnaires(lignes: Iterable[tuple], skip_rows: int) -> Iterator[Ligne]:
+    """
+    Associe chaque ligne brute aux noms de colonnes de la ligne d'en-tête
+
+    Args:
+        lignes (Iterable[tuple]): Lignes brutes
+        skip_rows (int): Nombre de lignes à sauter avant la ligne d'en-tête
+
+    Yields:
+        Ligne: Chaque ligne sous forme de dictionnaire colonne -> valeur
+    """
+    lignes = iter(lignes)
+    for _ in range(skip_rows):
+        next(lignes, None)
+    entete = next(lignes, None)
+    if entete is None:
+        return
+    for ligne in lignes:
+        # les lignes malformées (nombre de colonnes différent) sont ignorées
+        if len(ligne) == len(entete):
+            yield dict(zip(entete, ligne))
+
+
+def filtre_departements(departements: Set[str], colonne: str = "COM") -> Callable[[Ligne], bool]:
+    """
+    Crée un filtre conservant les lignes des départements donnés (région par exemple)
+
+    Args:
+        departements (Set[str]): Codes des départements à conserver
+        colonne (str): Colonne contenant le code commune
+
+    Returns:
+        Callable[[Ligne], bool]: Le filtre
+    """
+    return lambda ligne: str(ligne.get(colonne) or "")[:2] in departements
+
+
+def filtre_communes(communes: Iterable[str], colonne: str = "LIBCOM") -> Callable[[Ligne], bool]:
+    """
+    Crée un filtre conservant les lignes d'une liste de communes (noms normalisés)
+
+    Args:
+        communes (Iterable[str]): Noms des communes à conserver
+        colonne (str): Colonne contenant le nom de la commune
+
+    Returns:
+        Callable[[Ligne], bool]: Le filtre
+    """
+    communes_normalisees = {normalize_name(commune) for commune in communes}
+    return lambda ligne: normalize_name(ligne.get(colonne)) in communes_normalisees
+
+
+def convertir_lignes(lignes: Iterable[Ligne]) -> Iterator[Ligne]:
+    """
+    Convertit à la volée les indicateurs DEC_*18 en nombres et les codes en chaînes,
+    et écarte les lignes incomplètes ou non numériques
+
+    Args:
+        lignes (Iterable[Ligne]): Lignes brutes
+
+    Yields:
+        Ligne: Les lignes complètes, typées
+    """
+    for ligne in lignes:
+        if any(valeur is None or valeur == "" for valeur in ligne.values()):
+            continue
+        try:
+            for colonne, valeur in ligne.items():
+                if colonne.startswith("DEC_") and colonne.endswith("18"):
+                    ligne[colonne] = float(valeur)
+                elif colonne in COLONNES_CODES_SALAIRE:
+                    ligne[colonne] = str(valeur)
+        except (TypeError, ValueError):
+            continue
+        yield ligne
+
+
+def load_data_streaming(file_path: str, skip_rows: int = 0, xlsx: bool = True,
+                        filtre: Optional[Callable[[Ligne], bool]] = None) -> pd.DataFrame:
+    """
+    Charge un fichier ligne par ligne en filtrant, typant et supprimant les lignes
+    incomplètes au fil de la lecture : la mémoire utilisée est bornée par
+    le sous-ensemble conservé, pas par le fichier national
+
+    Args:
+        file_path (str): Le chemin du fichier à charger
+        skip_rows (int): Nombre de lignes à sauter avant la ligne d'en-tête
+        xlsx (bool): Si True, charge un fichier Excel, sinon un CSV
+        filtre (Optional[Callable[[Ligne], bool]]): Filtre appliqué à chaque ligne brute
+
+    Returns:
+        pd.DataFrame: Le DataFrame des lignes conservées
+    """
+    lignes: Iterable[Ligne] = iterer_lignes(file_path, skip_rows=skip_rows, xlsx=xlsx)
+    if filtre is not None:
+        lignes = filter(filtre, lignes)
+    conservees: List[Ligne] = list(convertir_lignes(lignes))
+
+    if not conservees:
+        raise ValueError("Le fichier est vide ou aucune ligne ne correspond au filtre.")
+    return pd.DataFrame.from_records(conservees)
+
+
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Nettoie les données en supprimant les valeurs manquantes
@@ -86,20 +244,91 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     return df.dropna()
 
 
+def apply_salary_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fixe les types des colonnes du fichier des salaires selon TYPES_SALAIRE : indicateurs
+    DEC_*18 en entiers 32 bits ou float32, libellés et code commune en catégories,
+    code IRIS en chaîne
+
+    Args:
+        df (pd.DataFrame): Le DataFrame des salaires nettoyé
+
+    Returns:
+        pd.DataFrame: Le DataFrame avec les types fixés
+    """
+    df = df.astype({col: str for col in COLONNES_CODES_SALAIRE if col in df.columns})
+    colonnes_dec = [col for col in df.columns if col.startswith("DEC_") and col.endswith("18")]
+    df[colonnes_dec] = df[colonnes_dec].apply(pd.to_numeric, errors="coerce")
+    # les valeurs non numériques devenues NaN sont supprimées comme les autres
+    df = df.dropna(subset=colonnes_dec)
+
+    types = {col: TYPE_INDICATEURS_SALAIRE for col in colonnes_dec}
+    types.update({col: type_ for col, type_ in TYPES_SALAIRE.items() if col in df.columns})
+    return df.astype(types)
+
+
+def rapport_memoire(avant: pd.DataFrame, apres: pd.DataFrame) -> Dict[str, float]:
+    """
+    Compare l'empreinte mémoire (memory_usage(deep=True)) de deux versions d'un DataFrame
+
+    Args:
+        avant (pd.DataFrame): Le DataFrame avec les types par défaut
+        apres (pd.DataFrame): Le DataFrame avec les types déclarés
+
+    Returns:
+        Dict[str, float]: Mémoire avant et après en Mo, et réduction en %
+    """
+    memoire_avant = avant.memory_usage(deep=True).sum() / 1024**2
+    memoire_apres = apres.memory_usage(deep=True).sum() / 1024**2
+    return {
+        "avant_mo": memoire_avant,
+        "apres_mo": memoire_apres,
+        "reduction_pct": 100 * (1 - memoire_apres / memoire_avant) if memoire_avant else 0.0,
+    }
+
+
 def save_data(df: pd.DataFrame, file_path: str) -> None:
     """
-    Sauvegarde les données dans un fichier Excel
+    Sauvegarde les données dans un fichier Parquet ou Excel selon l'extension
 
     Args:
         df (pd.DataFrame): Le DataFrame contenant les données à sauvegarder
-        file_path (str): Le chemin où sauvegarder les données
+        file_path (str): Le chemin où sauvegarder les données (.parquet ou .xlsx)
     """
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    df.to_excel(file_path, index=False)
+    if file_path.endswith(".parquet"):
+        df.to_parquet(file_path, index=False, engine="pyarrow")
+    else:
+        df.to_excel(file_path, index=False)
+
+
+def load_cleaned_data(file_path: str) -> pd.DataFrame:
+    """
+    Charge un fichier de données nettoyées (Parquet ou Excel selon l'extension)
+
+    Args:
+        file_path (str): Le chemin du fichier nettoyé
+
+    Returns:
+        pd.DataFrame: Le DataFrame contenant les données nettoyées
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
+
+    if file_path.endswith(".parquet"):
+        return pd.read_parquet(file_path, engine="pyarrow")
+    return pd.read_excel(file_path)
 
 
 def clean_data_process(
-    raw_path: str, cleaned_path: str, skip_rows: int, xlsx: bool = True
+    raw_path: str,
+    cleaned_path: str,
+    skip_rows: int,
+    xlsx: bool = True,
+    schema: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    excel_path: Optional[str] = None,
+    streaming: bool = False,
+    filtre: Optional[Callable[[Ligne], bool]] = None,
 ) -> None:
     """
     Fonction principale pour le nettoyage des données :
@@ -109,26 +338,60 @@ def clean_data_process(
         raw_path (str): Chemin des données brutes
         cleaned_path (str): Chemin des données nettoyées
         skip_rows (int): Nombre de lignes à sauter au début des données brutes
+        xlsx (bool): Si True, les données brutes sont au format Excel
+        schema (Optional[Callable]): Fonction fixant les types des colonnes
+        excel_path (Optional[str]): Si renseigné, exporte aussi les données en Excel
+        streaming (bool): Si True, lit les données brutes ligne par ligne (voir load_data_streaming)
+        filtre (Optional[Callable]): En lecture continue, filtre appliqué à chaque ligne brute
     """
     try:
-        df = load_data(raw_path, skip_rows=skip_rows, xlsx=xlsx)
+        if streaming:
+            df = load_data_streaming(raw_path, skip_rows=skip_rows, xlsx=xlsx, filtre=filtre)
+        else:
+            df = load_data(raw_path, skip_rows=skip_rows, xlsx=xlsx)
         df_cleaned = clean_data(df)
+        if schema is not None:
+            df_types = schema(df_cleaned)
+            memoire = rapport_memoire(df_cleaned, df_types)
+            print(
+                f"Mémoire : {memoire['avant_mo']:.2f} Mo avec les types par défaut, "
+                f"{memoire['apres_mo']:.2f} Mo avec les types déclarés (-{memoire['reduction_pct']:.0f} %)"
+            )
+            df_cleaned = df_types
         save_data(df_cleaned, cleaned_path)
         print(f"Données nettoyées et sauvegardées dans : {cleaned_path}")
+        if excel_path:
+            save_data(df_cleaned, excel_path)
+            print(f"Export Excel des données nettoyées : {excel_path}")
     except (FileNotFoundError, ValueError) as e:
         print(f"Erreur lors du nettoyage des données : {e}")
         exit(1)
 
 
-def clean_all_raw_files() -> None:
+def clean_all_raw_files(export_excel: bool = False, force: bool = False,
+                        streaming: bool = False) -> None:
     """
     Nettoie tous les fichiers de données brutes et sauvegarde les résultats nettoyés
+
+    Args:
+        export_excel (bool): Si True, exporte aussi les salaires nettoyés en Excel
+        force (bool): Si True, nettoie à nouveau même si les fichiers nettoyés existent
+        streaming (bool): Si True, lit le fichier national des salaires ligne par ligne
+            et ne conserve que les IRIS d'Île-de-France
     """
 
-    if not os.path.isfile(CLEANED_DATA_PATH_SALAIRE):
-        clean_data_process(RAW_DATA_PATH_SALAIRE, CLEANED_DATA_PATH_SALAIRE, 5)
+    if force or not os.path.isfile(CLEANED_DATA_PATH_SALAIRE):
+        clean_data_process(
+            RAW_DATA_PATH_SALAIRE,
+            CLEANED_DATA_PATH_SALAIRE,
+            5,
+            schema=apply_salary_schema,
+            excel_path=CLEANED_DATA_PATH_SALAIRE_EXCEL if export_excel else None,
+            streaming=streaming,
+            filtre=filtre_departements(DEPARTEMENTS_IDF) if streaming else None,
+        )
 
-    if not os.path.isfile(CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE):
+    if force or not os.path.isfile(CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE):
         clean_data_process(
             RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
             CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
@@ -138,4 +401,10 @@ def clean_all_raw_files() -> None:
 
 
 if __name__ == "__main__":
-    clean_all_raw_files()
+    import sys
+
+    clean_all_raw_files(
+        export_excel="--excel" in sys.argv,
+        force="--force" in sys.argv,
+        streaming="--streaming" in sys.argv,
+    )
@@ -0,0 +1,32 @@
+import os
+
+# Mode démarrage rapide (DASHBOARD_FAST_START=1) : l'application ne lit que des artefacts
+# déjà construits par le pipeline et refuse tout accès réseau
+VARIABLE_DEMARRAGE_RAPIDE = "DASHBOARD_FAST_START"
+
+
+def est_actif() -> bool:
+    """
+    Indique si le mode démarrage rapide est activé
+
+    Returns:
+        bool: True si DASHBOARD_FAST_START vaut 1
+    """
+    return os.environ.get(VARIABLE_DEMARRAGE_RAPIDE, "0") == "1"
+
+
+def verifier_acces_reseau(url: str) -> None:
+    """
+    Refuse un accès réseau en mode démarrage rapide
+
+    Args:
+        url (str): L'URL qui allait être interrogée
+
+    Raises:
+        RuntimeError: Si le mode démarrage rapide est activé
+    """
+    if est_actif():
+        raise RuntimeError(
+            f"Accès réseau refusé en mode démarrage rapide ({VARIABLE_DEMARRAGE_RAPIDE}=1) : {url}. "
+            "Construisez les données avec : python -m utils.pipeline"
+        )
@@ -1,13 +1,26 @@
 import os
+import time
+import asyncio
 import requests
+import aiohttp
 import pandas as pd
 import urllib.parse
 from typing import Optional, Tuple, List
 
+from utils.http_async import LimiteurDebit, creer_session, get_json
+from utils.cache_geocodage import afficher_stats, ecrire_cache, lire_cache, ouvrir_cache
+from utils.demarrage_rapide import verifier_acces_reseau
+
 # Chemins des fichiers
 CHEMIN_DONNEES_ENTREE = os.path.join("data", "cleaned", "cleanedcommunesiledefrance.xlsx")
 CHEMIN_DONNEES_SORTIE = os.path.join("data", "cleaned", "cleanedcoordonnees.xlsx")
 
+# API Adresse : limitée à 50 requêtes par seconde et par IP
+API_URL = "https://api-adresse.data.gouv.fr/search/?q="
+CONCURRENCE = 10
+REQUETES_PAR_SECONDE = 40.0
+TENTATIVES = 4
+
 def charger_donnees(file_path: str) -> pd.DataFrame:
     """
     Charge les données depuis un fichier Excel.
@@ -33,9 +46,9 @@ def recuperer_coordonnees(ville: str) -> Tuple[str, Optional[float], Optional[fl
     Returns:
         Tuple[str, Optional[float], Optional[float]]: Nom de la ville, latitude, longitude.
     """
-    api_url = "https://api-adresse.data.gouv.fr/search/?q="
+    verifier_acces_reseau(API_URL)
     try:
-        response = requests.get(api_url + urllib.parse.quote(ville))
+        response = requests.get(API_URL + urllib.parse.quote(ville))
         response.raise_for_status()
         data = response.json()
         if data["features"]:
@@ -45,6 +58,110 @@ def recuperer_coordonnees(ville: str) -> Tuple[str, Optional[float], Optional[fl
     except requests.RequestException:
         return ville, None, None
 
+def extraire_coordonnees_reponse(data: Optional[dict]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Extrait la latitude et la longitude du premier résultat d'une réponse de l'API Adresse.
+
+    Args:
+        data (Optional[dict]): Réponse JSON de l'API, None si la requête a échoué.
+
+    Returns:
+        Tuple[Optional[float], Optional[float]]: Latitude, longitude.
+    """
+    if data and data.get("features"):
+        longitude, latitude = data["features"][0]["geometry"]["coordinates"]
+        return latitude, longitude
+    return None, None
+
+async def recuperer_coordonnees_async(
+    session: aiohttp.ClientSession,
+    ville: str,
+    limiteur: LimiteurDebit,
+    semaphore: asyncio.Semaphore,
+    api_url: str = API_URL,
+    tentatives: int = TENTATIVES,
+    stats: Optional[dict] = None,
+) -> Tuple[str, Optional[float], Optional[float]]:
+    """
+    Récupère les coordonnées géographiques d'une ville sans bloquer les autres requêtes.
+
+    Args:
+        session (aiohttp.ClientSession): Session HTTP partagée (connexions persistantes).
+        ville (str): Le nom de la ville.
+        limiteur (LimiteurDebit): Limiteur de débit partagé.
+        semaphore (asyncio.Semaphore): Borne le nombre de requêtes en cours.
+        api_url (str): URL de l'API (remplaçable par un serveur local de test).
+        tentatives (int): Nombre maximal de tentatives.
+        stats (Optional[dict]): Compteurs de nouvelles tentatives et d'échecs,
+            et liste "villes_en_echec" des villes dont la requête a échoué.
+
+    Returns:
+        Tuple[str, Optional[float], Optional[float]]: Nom de la ville, latitude, longitude.
+    """
+    async with semaphore:
+        data = await get_json(session, api_url + urllib.parse.quote(ville), limiteur,
+                              tentatives=tentatives, stats=stats)
+    if data is None and stats is not None:
+        stats.setdefault("villes_en_echec", []).append(ville)
+    return (ville, *extraire_coordonnees_reponse(data))
+
+async def geocoder_villes_async(
+    villes: List[str],
+    concurrence: int = CONCURRENCE,
+    requetes_par_seconde: float = REQUETES_PAR_SECONDE,
+    tentatives: int = TENTATIVES,
+    api_url: str = API_URL,
+    echecs: Optional[List[str]] = None,
+) -> List[Tuple[str, Optional[float], Optional[float]]]:
+    """
+    Géocode une liste de villes en parallèle, avec une concurrence bornée,
+    un débit limité et de nouvelles tentatives en cas d'erreur.
+
+    Args:
+        villes (List[str]): Les noms des villes.
+        concurrence (int): Nombre maximal de requêtes simultanées.
+        requetes_par_seconde (float): Débit maximal autorisé par l'API.
+        tentatives (int): Nombre maximal de tentatives par ville.
+        api_url (str): URL de l'API (remplaçable par un serveur local de test).
+        echecs (Optional[List[str]]): Si fournie, reçoit les villes dont la requête a échoué.
+
+    Returns:
+        List[Tuple[str, Optional[float], Optional[float]]]: Nom, latitude et longitude de chaque ville.
+    """
+    limiteur = LimiteurDebit(requetes_par_seconde)
+    semaphore = asyncio.Semaphore(concurrence)
+    stats: dict = {}
+
+    debut = time.perf_counter()
+    async with creer_session(concurrence) as session:
+        resultats = await asyncio.gather(*[
+            recuperer_coordonnees_async(session, ville, limiteur, semaphore, api_url, tentatives, stats)
+            for ville in villes
+        ])
+    duree = time.perf_counter() - debut
+    if echecs is not None:
+        echecs.extend(stats.get("villes_en_echec", []))
+
+    debit = len(villes) / duree if duree > 0 else 0.0
+    print(
+        f"{len(villes)} villes géocodées en {duree:.1f} s ({debit:.1f} requêtes/s, "
+        f"{stats.get('reessais', 0)} nouvelles tentatives, {stats.get('echecs', 0)} échecs)"
+    )
+    return resultats
+
+def geocoder_villes(villes: List[str], **options) -> List[Tuple[str, Optional[float], Optional[float]]]:
+    """
+    Point d'entrée synchrone du géocodage parallèle (voir geocoder_villes_async).
+
+    Args:
+        villes (List[str]): Les noms des villes.
+        **options: Options transmises à geocoder_villes_async.
+
+    Returns:
+        List[Tuple[str, Optional[float], Optional[float]]]: Nom, latitude et longitude de chaque ville.
+    """
+    return asyncio.run(geocoder_villes_async(villes, **options))
+
 def sauvegarder_donnees(df: pd.DataFrame, file_path: str) -> None:
     """
     Sauvegarde un DataFrame dans un fichier Excel.
@@ -72,8 +189,18 @@ def extraire_coordonnees(file_path_entree: str, file_path_sortie: str) -> None:
         # Extraire les noms uniques des villes
         villes_uniques: List[str] = data["nomcom"].drop_duplicates().dropna().tolist()
 
-        # Récupérer les coordonnées pour chaque ville
-        resultats = [recuperer_coordonnees(ville) for ville in villes_uniques]
+        # Chercher d'abord dans le cache, puis géocoder en parallèle les villes inconnues ou expirées
+        conn = ouvrir_cache()
+        try:
+            trouvees, a_geocoder, stats = lire_cache(conn, villes_uniques)
+            echecs: List[str] = []
+            nouvelles = geocoder_villes(a_geocoder, echecs=echecs) if a_geocoder else []
+            ecrire_cache(conn, nouvelles, echecs)
+        finally:
+            conn.close()
+        trouvees.update({ville: (latitude, longitude) for ville, latitude, longitude in nouvelles})
+        resultats = [(ville, *trouvees[ville]) for ville in villes_uniques]
+        afficher_stats(stats)
 
         # Transformer les résultats en DataFrame
         df_resultats = pd.DataFrame(resultats, columns=["Ville", "Latitude", "Longitude"])
@@ -1,6 +1,8 @@
 import os
 import requests
 
+from utils.demarrage_rapide import verifier_acces_reseau
+
 URL_SALAIRE = "https://www.insee.fr/fr/statistiques/fichier/5055909/BASE_TD_FILO_DEC_IRIS_2018.xlsx"
 URL_COMMUNES_ILE_DE_FRANCE = (
     "https://www.data.gouv.fr/fr/datasets/r/91c0bdc4-0a5b-4ac8-950e-64a1ec207957"
@@ -13,9 +15,6 @@ DESTINATION_FILE_COMMUNES_ILE_DE_FRANCE = os.path.join(
     DESTINATION_DIRECTORY, "rawdatacommunesiledefrance.csv"
 )
 
-# Création du répertoire de destination si nécessaire
-os.makedirs(DESTINATION_DIRECTORY, exist_ok=True)
-
 
 def download_data(url: str, destination_file: str) -> bool:
     """
@@ -28,6 +27,8 @@ def download_data(url: str, destination_file: str) -> bool:
     Returns:
         bool: True si le téléchargement a réussi, False sinon
     """
+    verifier_acces_reseau(url)
+    os.makedirs(os.path.dirname(destination_file), exist_ok=True)
     try:
         response = requests.get(url, stream=True)
         response.raise_for_status()
@@ -58,17 +59,20 @@ def is_file_valid(file_path: str) -> bool:
     return os.path.isfile(file_path) and os.path.getsize(file_path) > 0
 
 
-def download_all_data() -> None:
+def download_all_data(force: bool = False) -> None:
     """
     Télécharge tous les fichiers de données si ils n'existent pas déjà localement ou s'ils sont vides
+
+    Args:
+        force (bool): Si True, télécharge les fichiers même s'ils existent déjà
     """
     # Télécharger les fichiers uniquement s'ils n'existent pas ou sont vides
-    if not is_file_valid(DESTINATION_FILE_SALAIRE):
+    if force or not is_file_valid(DESTINATION_FILE_SALAIRE):
         print("Téléchargementsalaires...")
         if not download_data(URL_SALAIRE, DESTINATION_FILE_SALAIRE):
             print("Échec du téléchargement salaires")
 
-    if not is_file_valid(DESTINATION_FILE_COMMUNES_ILE_DE_FRANCE):
+    if force or not is_file_valid(DESTINATION_FILE_COMMUNES_ILE_DE_FRANCE):
         print("Téléchargement communes d'Île-de-France...")
         if not download_data(URL_COMMUNES_ILE_DE_FRANCE, DESTINATION_FILE_COMMUNES_ILE_DE_FRANCE):
             print("Échec du téléchargement communes d'Île-de-France")
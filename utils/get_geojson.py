@@ -1,16 +1,38 @@
+import os
 import json
-import requests
+import time
+import asyncio
+import urllib.parse
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from typing import List, Dict, Any
+import shapely
+from shapely.geometry import mapping, shape
+from typing import List, Dict, Any, Optional, Set
+from utils.agregats import CHEMINS_AGREGATS
+from utils.chemins import GENERER_TOPOJSON  # DASHBOARD_TOPOJSON=1, ou --topojson
+from utils.clean_data import load_cleaned_data, RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE
+from utils.http_async import LimiteurDebit, creer_session, get_json_en_cache
+from utils.topojson import encoder_topojson
 
 # Constantes
 API_URL = "https://geo.api.gouv.fr/communes?nom={}&fields=contour,codeRegion,codesPostaux&format=geojson&geometry=contour"
+API_URL_CODE = "https://geo.api.gouv.fr/communes/{}?fields=contour,codeRegion,codesPostaux&format=geojson&geometry=contour"
+DOSSIER_CACHE_CONTOURS = "data/cache/contours"
+CONCURRENCE_CONTOURS = 10
+REQUETES_PAR_SECONDE_CONTOURS = 40.0
+TIMEOUT_CONTOURS = 15.0
 CODE_REGION_IDF = "11"
 ARRONDISSEMENTS_GEOJSON_PATH = "data/geojson/arrondissements.geojson"
 OUTPUT_GEOJSON_PATH = "data/geojson/communesiledefrance.geojson"
 EXCEL_COORDONNEES = "data/cleaned/cleanedcoordonnees.xlsx"
-EXCEL_SALAIRES = "data/cleaned/cleanedsalaire.xlsx"
+# Variantes simplifiées de la carte : zoom minimal -> (tolérance en degrés, décimales conservées)
+VARIANTES_ZOOM = {
+    0: (0.001, 4),
+    10: (0.0003, 5),
+    12: (0.00005, 5),
+}
+FICHIER_AGREGATS_COMMUNES = CHEMINS_AGREGATS["commune"]
 
 def charger_villes_depuis_excel(fichier_excel: str) -> List[str]:
     """
@@ -26,60 +48,146 @@ def charger_villes_depuis_excel(fichier_excel: str) -> List[str]:
     return villes_df.iloc[:, 0].dropna().unique().tolist()
 
 
-def nettoyer_donnees_salaires(fichier_salaire: str) -> pd.DataFrame:
+def charger_codes_insee(fichier_csv: str) -> Dict[str, List[str]]:
     """
-    Nettoie et prépare les données de salaires.
+    Charge les codes INSEE des communes depuis le fichier brut des communes d'IDF.
 
     Args:
-        fichier_salaire (str): Chemin du fichier Excel des salaires.
+        fichier_csv (str): Chemin du fichier CSV brut des communes.
 
     Returns:
-        pd.DataFrame: Données de salaires nettoyées et agrégées.
+        Dict[str, List[str]]: Codes INSEE de chaque nom de commune (plusieurs pour les homonymes).
     """
-    salaire_data = pd.read_excel(fichier_salaire)
-    salaire_data_cleaned = salaire_data.rename(columns={salaire_data.columns[2]: "code_commune"})
-    salaire_data_cleaned["code_commune"] = salaire_data_cleaned["code_commune"].astype(str).str.zfill(5)
-    salaire_data_cleaned.iloc[:, 7] = pd.to_numeric(salaire_data_cleaned.iloc[:, 7], errors="coerce")
-    salaire_data_cleaned.iloc[:, 20] = pd.to_numeric(salaire_data_cleaned.iloc[:, 20], errors="coerce")
+    communes = pd.read_csv(fichier_csv, sep=";", usecols=["insee", "nomcom"], dtype={"insee": str}).dropna()
+    codes = communes["insee"].str.zfill(5)
+    return codes.groupby(communes["nomcom"]).agg(list).to_dict()
 
-    salaire_data_grouped = salaire_data_cleaned.groupby("code_commune").agg({
-        salaire_data_cleaned.columns[7]: "mean",
-        salaire_data_cleaned.columns[20]: "mean"
-    }).reset_index()
 
-    salaire_data_grouped.rename(columns={
-        salaire_data_cleaned.columns[7]: "mediane_salaire_moyenne",
-        salaire_data_cleaned.columns[20]: "indice_gini_moyen"
-    }, inplace=True)
+def charger_salaires_communes(fichier_agregats: str) -> pd.DataFrame:
+    """
+    Charge les salaires par commune depuis la table agrégée construite à l'ingestion.
+
+    Args:
+        fichier_agregats (str): Chemin de la table agrégée des communes (Parquet).
+
+    Returns:
+        pd.DataFrame: Code commune, moyenne des salaires médians et moyenne des indices de Gini.
+    """
+    communes = load_cleaned_data(fichier_agregats)
+    return pd.DataFrame({
+        "code_commune": communes["COM"].astype(str).str.zfill(5),
+        "mediane_salaire_moyenne": communes["DEC_MED18_moyenne"],
+        "indice_gini_moyen": communes["DEC_GI18_moyenne"],
+    })
+
+
+def extraire_features_idf(data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Extrait les features d'Île-de-France d'une réponse de l'API (commune seule ou collection).
+
+    Args:
+        data (Optional[Dict[str, Any]]): Réponse GeoJSON de l'API.
+
+    Returns:
+        List[Dict[str, Any]]: Features d'Île-de-France, avec leur code de département.
+    """
+    if not data:
+        return []
+    candidates = data["features"] if "features" in data else [data]
+
+    features = []
+    for feature in candidates:
+        if feature.get("properties", {}).get("codeRegion") == CODE_REGION_IDF:
+            codes_postaux = feature["properties"].get("codesPostaux", [])
+            code_departement = codes_postaux[0][:2] if codes_postaux else "Inconnu"
+            feature["properties"]["codeDepartement"] = code_departement
+            features.append(feature)
+    return features
+
+
+async def _recuperer_reponses(urls: List[str], concurrence: int, timeout: float,
+                              stats: Dict[str, int]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Récupère les réponses de l'API en parallèle, en passant par le cache disque.
+
+    Args:
+        urls (List[str]): URLs à interroger.
+        concurrence (int): Nombre maximal de requêtes simultanées.
+        timeout (float): Délai maximal de chaque requête, en secondes.
+        stats (Dict[str, int]): Compteurs mis à jour (cache, nouvelles tentatives, échecs).
+
+    Returns:
+        List[Optional[Dict[str, Any]]]: Réponse de chaque URL, None en cas d'échec.
+    """
+    limiteur = LimiteurDebit(REQUETES_PAR_SECONDE_CONTOURS)
+    semaphore = asyncio.Semaphore(concurrence)
+
+    async with creer_session(concurrence, timeout) as session:
+        async def recuperer(url: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await get_json_en_cache(session, url, DOSSIER_CACHE_CONTOURS, limiteur, stats)
 
-    return salaire_data_grouped
+        return await asyncio.gather(*[recuperer(url) for url in urls])
 
 
-def recuperer_contours_villes(villes: List[str]) -> List[Dict[str, Any]]:
+def recuperer_contours_villes(villes: List[str], codes_insee: Optional[Dict[str, List[str]]] = None,
+                              concurrence: int = CONCURRENCE_CONTOURS,
+                              timeout: float = TIMEOUT_CONTOURS) -> List[Dict[str, Any]]:
     """
-    Récupère les contours des villes depuis l'API geo.api.gouv.fr.
+    Récupère les contours des villes depuis l'API geo.api.gouv.fr, en parallèle et avec cache.
+    Les villes dont le code INSEE est connu sont demandées par code, ce qui évite de
+    télécharger les communes homonymes hors IDF ; les autres sont demandées par nom.
 
     Args:
         villes (List[str]): Liste des noms de villes.
+        codes_insee (Optional[Dict[str, List[str]]]): Codes INSEE connus par nom de ville.
+        concurrence (int): Nombre maximal de requêtes simultanées.
+        timeout (float): Délai maximal de chaque requête, en secondes.
 
     Returns:
         List[Dict[str, Any]]: Liste des features GeoJSON pour les villes.
     """
+    codes_insee = codes_insee or {}
+    stats: Dict[str, int] = {}
+    debut = time.perf_counter()
+
+    # (ville, code INSEE demandé ou None pour une demande par nom, URL)
+    requetes = [
+        (ville, code, API_URL_CODE.format(code))
+        for ville in villes for code in codes_insee.get(ville, [])
+    ]
+    requetes += [(ville, None, API_URL.format(urllib.parse.quote(ville))) for ville in villes if ville not in codes_insee]
+    reponses = asyncio.run(_recuperer_reponses([url for _, _, url in requetes], concurrence, timeout, stats))
+
+    # une ville dont la demande par code a échoué est redemandée par nom ; de la réponse,
+    # seules les communes des codes en échec sont gardées (pas de doublon d'un homonyme déjà reçu)
+    codes_echoues: Dict[str, Set[str]] = {}
+    for (ville, code, _), data in zip(requetes, reponses):
+        if data is None and code is not None:
+            codes_echoues.setdefault(ville, set()).add(code)
+
     features = []
+    for data in reponses:
+        features.extend(extraire_features_idf(data))
+
+    if codes_echoues:
+        requetes_nom = [(ville, None, API_URL.format(urllib.parse.quote(ville))) for ville in sorted(codes_echoues)]
+        reponses_nom = asyncio.run(_recuperer_reponses([url for _, _, url in requetes_nom], concurrence, timeout, stats))
+        for (ville, _, _), data in zip(requetes_nom, reponses_nom):
+            features.extend(feature for feature in extraire_features_idf(data)
+                            if feature["properties"].get("code") in codes_echoues[ville])
+        requetes += requetes_nom
+        reponses += reponses_nom
+
+    villes_trouvees = {ville for (ville, _, _), data in zip(requetes, reponses) if data is not None}
     for ville in villes:
-        try:
-            response = requests.get(API_URL.format(ville))
-            data = response.json()
-
-            if "features" in data:
-                for feature in data["features"]:
-                    if feature["properties"]["codeRegion"] == CODE_REGION_IDF:
-                        codes_postaux = feature["properties"].get("codesPostaux", [])
-                        code_departement = codes_postaux[0][:2] if codes_postaux else "Inconnu"
-                        feature["properties"]["codeDepartement"] = code_departement
-                        features.append(feature)
-        except Exception as e:
-            print(f"Erreur pour la ville {ville}: {e}")
+        if ville not in villes_trouvees:
+            print(f"Erreur pour la ville {ville}")
+
+    print(
+        f"Contours récupérés en {time.perf_counter() - debut:.1f} s : {len(requetes)} requêtes, "
+        f"{stats.get('cache', 0)} lues dans le cache, {stats.get('echecs', 0)} échecs"
+    )
     return features
 
 
@@ -140,15 +248,33 @@ def generer_geojson_final(villes_features: List[Dict[str, Any]], arrondissements
         None
     """
     features = villes_features + arrondissements_features
+
+    # index code_commune -> salaires construit une seule fois : une recherche par feature
+    salaires_par_code = (
+        salaire_data.drop_duplicates("code_commune")
+        .set_index("code_commune")[["mediane_salaire_moyenne", "indice_gini_moyen"]]
+        .to_dict("index")
+    )
+
+    sans_correspondance = []
     for feature in features:
         code_commune = feature["properties"].get("code")
-        if code_commune and code_commune in salaire_data["code_commune"].values:
-            salaire_info = salaire_data[salaire_data["code_commune"] == code_commune].iloc[0]
-            feature["properties"]["mediane_salaire_moyenne"] = salaire_info["mediane_salaire_moyenne"]
-            feature["properties"]["indice_gini_moyen"] = salaire_info["indice_gini_moyen"]
+        salaire_info = salaires_par_code.get(code_commune) if code_commune else None
+        if salaire_info is not None:
+            # float Python : json.dump refuse les scalaires numpy (float32 notamment)
+            feature["properties"]["mediane_salaire_moyenne"] = float(salaire_info["mediane_salaire_moyenne"])
+            feature["properties"]["indice_gini_moyen"] = float(salaire_info["indice_gini_moyen"])
         else:
             feature["properties"]["mediane_salaire_moyenne"] = None
             feature["properties"]["indice_gini_moyen"] = None
+            sans_correspondance.append(feature["properties"].get("nom", code_commune))
+
+    if sans_correspondance:
+        print(
+            f"{len(sans_correspondance)}/{len(features)} features sans données de salaires : "
+            + ", ".join(map(str, sans_correspondance[:20]))
+            + (" ..." if len(sans_correspondance) > 20 else "")
+        )
 
     geojson_final = {"type": "FeatureCollection", "features": features}
     with open(output_path, "w", encoding="utf-8") as file:
@@ -156,9 +282,152 @@ def generer_geojson_final(villes_features: List[Dict[str, Any]], arrondissements
     print(f"Fichier GeoJSON complet généré : {output_path}")
 
 
-if __name__ == "__main__":
+def chemin_variante(output_path: str, zoom_min: int) -> str:
+    """
+    Calcule le chemin de la variante simplifiée d'un GeoJSON pour un zoom minimal.
+
+    Args:
+        output_path (str): Chemin du GeoJSON complet.
+        zoom_min (int): Zoom à partir duquel la variante est utilisée.
+
+    Returns:
+        str: Chemin de la variante (ex. communesiledefrance.z10.geojson).
+    """
+    racine, extension = os.path.splitext(output_path)
+    return f"{racine}.z{zoom_min}{extension}"
+
+
+def simplifier_features(features: List[Dict[str, Any]], tolerance: float, decimales: int) -> List[Dict[str, Any]]:
+    """
+    Simplifie les contours et réduit la précision des coordonnées.
+    La simplification par couverture conserve les frontières communes
+    entre communes voisines (pas de trous ni de chevauchements) ; à défaut
+    (GEOS < 3.12), chaque contour est simplifié par Douglas-Peucker en
+    préservant sa topologie.
+
+    Args:
+        features (List[Dict[str, Any]]): Features GeoJSON d'origine.
+        tolerance (float): Tolérance de simplification, en degrés.
+        decimales (int): Nombre de décimales conservées pour les coordonnées.
+
+    Returns:
+        List[Dict[str, Any]]: Nouvelles features simplifiées (propriétés inchangées).
+    """
+    geometries = np.array([shape(feature["geometry"]) for feature in features], dtype=object)
+    if hasattr(shapely, "coverage_simplify"):
+        simplifiees = shapely.coverage_simplify(geometries, tolerance)
+    else:
+        simplifiees = shapely.simplify(geometries, tolerance, preserve_topology=True)
+    # arrondir après simplification : un sommet partagé reste identique des deux côtés
+    simplifiees = shapely.transform(simplifiees, lambda coords: np.round(coords, decimales))
+
+    return [
+        {"type": "Feature", "geometry": mapping(geometrie), "properties": feature["properties"]}
+        for feature, geometrie in zip(features, simplifiees)
+    ]
+
+
+def generer_variantes_simplifiees(output_path: str, variantes: Dict[int, tuple] = VARIANTES_ZOOM) -> Dict[int, str]:
+    """
+    Génère une variante simplifiée du GeoJSON final par niveau de zoom
+    et affiche la taille de chaque fichier avant et après.
+
+    Args:
+        output_path (str): Chemin du GeoJSON complet.
+        variantes (Dict[int, tuple]): Zoom minimal -> (tolérance, décimales).
+
+    Returns:
+        Dict[int, str]: Chemin de chaque variante, par zoom minimal.
+    """
+    with open(output_path, "r", encoding="utf-8") as file:
+        geojson_complet = json.load(file)
+    taille_initiale = os.path.getsize(output_path)
+
+    chemins = {}
+    for zoom_min, (tolerance, decimales) in sorted(variantes.items()):
+        features = simplifier_features(geojson_complet["features"], tolerance, decimales)
+        chemin = chemin_variante(output_path, zoom_min)
+        with open(chemin, "w", encoding="utf-8") as file:
+            json.dump({"type": "FeatureCollection", "features": features}, file,
+                      ensure_ascii=False, separators=(",", ":"))
+        taille = os.path.getsize(chemin)
+        print(
+            f"Variante zoom >= {zoom_min} (tolérance {tolerance}, {decimales} décimales) : "
+            f"{taille_initiale / 1024:.0f} Ko -> {taille / 1024:.0f} Ko "
+            f"(-{100 * (1 - taille / taille_initiale):.0f} %) : {chemin}"
+        )
+        chemins[zoom_min] = chemin
+    return chemins
+
+
+def chemin_topojson(output_path: str) -> str:
+    """
+    Calcule le chemin de la version TopoJSON d'un GeoJSON.
+
+    Args:
+        output_path (str): Chemin du GeoJSON.
+
+    Returns:
+        str: Chemin du TopoJSON (ex. communesiledefrance.topojson).
+    """
+    return f"{os.path.splitext(output_path)[0]}.topojson"
+
+
+def generer_topojson(output_path: str) -> str:
+    """
+    Encode le GeoJSON final en TopoJSON (frontières partagées, coordonnées quantifiées)
+    et affiche la taille du GeoJSON, du GeoJSON compact et du TopoJSON.
+
+    Args:
+        output_path (str): Chemin du GeoJSON final.
+
+    Returns:
+        str: Chemin du fichier TopoJSON.
+    """
+    with open(output_path, "r", encoding="utf-8") as file:
+        geojson = json.load(file)
+    taille_initiale = os.path.getsize(output_path)
+    taille_compacte = len(json.dumps(geojson, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    chemin = chemin_topojson(output_path)
+    topologie = encoder_topojson(geojson, "communes")
+    with open(chemin, "w", encoding="utf-8") as file:
+        json.dump(topologie, file, ensure_ascii=False, separators=(",", ":"))
+    taille = os.path.getsize(chemin)
+    print(
+        f"TopoJSON ({len(topologie['arcs'])} arcs) : {taille_initiale / 1024:.0f} Ko -> {taille / 1024:.0f} Ko "
+        f"(-{100 * (1 - taille / taille_initiale):.0f} %, -{100 * (1 - taille / taille_compacte):.0f} % "
+        f"par rapport au GeoJSON compact de {taille_compacte / 1024:.0f} Ko) : {chemin}"
+    )
+    return chemin
+
+
+def generer_geojson(topojson: bool = GENERER_TOPOJSON) -> None:
+    """
+    Construit le GeoJSON final à partir des fichiers nettoyés et de l'API
+
+    Args:
+        topojson (bool): Si True, écrit aussi la version TopoJSON
+    """
     villes = charger_villes_depuis_excel(EXCEL_COORDONNEES)
-    salaire_data = nettoyer_donnees_salaires(EXCEL_SALAIRES)
-    villes_features = recuperer_contours_villes(villes)
+    codes_insee = charger_codes_insee(RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE)
+    salaire_data = charger_salaires_communes(FICHIER_AGREGATS_COMMUNES)
+    villes_features = recuperer_contours_villes(villes, codes_insee)
     arrondissements_features = charger_contours_arrondissements(ARRONDISSEMENTS_GEOJSON_PATH)
     generer_geojson_final(villes_features, arrondissements_features, salaire_data, OUTPUT_GEOJSON_PATH)
+    generer_variantes_simplifiees(OUTPUT_GEOJSON_PATH)
+    if topojson:
+        generer_topojson(OUTPUT_GEOJSON_PATH)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--simplifier" in sys.argv or "--topojson-seul" in sys.argv:
+        # ne régénère que les variantes simplifiées ou le TopoJSON à partir du GeoJSON existant
+        if "--simplifier" in sys.argv:
+            generer_variantes_simplifiees(OUTPUT_GEOJSON_PATH)
+        if "--topojson-seul" in sys.argv:
+            generer_topojson(OUTPUT_GEOJSON_PATH)
+    else:
+        generer_geojson(GENERER_TOPOJSON or "--topojson" in sys.argv)
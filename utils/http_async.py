@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+import aiohttp
+
+from utils.demarrage_rapide import verifier_acces_reseau
+
+# Codes HTTP pour lesquels une nouvelle tentative a du sens
+CODES_A_REESSAYER = {429, 500, 502, 503, 504}
+
+
+class LimiteurDebit:
+    """
+    Limiteur de débit partagé par des tâches asynchrones : espace les requêtes
+    pour ne jamais dépasser un nombre de requêtes par seconde
+    """
+
+    def __init__(self, requetes_par_seconde: float) -> None:
+        """
+        Args:
+            requetes_par_seconde (float): Débit maximal autorisé par l'API
+        """
+        self.intervalle = 1.0 / requetes_par_seconde
+        self.prochain_creneau = 0.0
+        self.verrou = asyncio.Lock()
+
+    async def attendre(self) -> None:
+        """
+        Attend le prochain créneau disponible
+        """
+        async with self.verrou:
+            maintenant = time.monotonic()
+            attente = self.prochain_creneau - maintenant
+            self.prochain_creneau = max(maintenant, self.prochain_creneau) + self.intervalle
+        if attente > 0:
+            await asyncio.sleep(attente)
+
+
+def creer_session(concurrence: int, timeout: float = 10.0) -> aiohttp.ClientSession:
+    """
+    Crée une session HTTP dont le pool de connexions persistantes est borné
+    par la concurrence
+
+    Args:
+        concurrence (int): Nombre maximal de connexions simultanées
+        timeout (float): Délai maximal d'une requête, en secondes
+
+    Returns:
+        aiohttp.ClientSession: La session à utiliser pour toutes les requêtes
+    """
+    verifier_acces_reseau("nouvelle session HTTP")
+    connecteur = aiohttp.TCPConnector(limit=concurrence, keepalive_timeout=30)
+    return aiohttp.ClientSession(connector=connecteur, timeout=aiohttp.ClientTimeout(total=timeout))
+
+
+async def get_json(
+    session: aiohttp.ClientSession,
+    url: str,
+    limiteur: Optional[LimiteurDebit] = None,
+    tentatives: int = 4,
+    delai_initial: float = 0.5,
+    stats: Optional[Dict[str, int]] = None,
+) -> Optional[Any]:
+    """
+    Récupère une réponse JSON en réessayant avec un délai exponentiel
+    sur les erreurs réseau, les 429 et les erreurs serveur
+
+    Args:
+        session (aiohttp.ClientSession): Session HTTP partagée
+        url (str): URL à interroger
+        limiteur (Optional[LimiteurDebit]): Limiteur de débit à respecter
+        tentatives (int): Nombre maximal de tentatives
+        delai_initial (float): Délai avant la première nouvelle tentative, doublé ensuite
+        stats (Optional[Dict[str, int]]): Compteurs "reessais" et "echecs" mis à jour
+
+    Returns:
+        Optional[Any]: Le JSON décodé, ou None si la requête a échoué
+    """
+    stats = stats if stats is not None else {}
+    for tentative in range(tentatives):
+        if tentative:
+            stats["reessais"] = stats.get("reessais", 0) + 1
+        if limiteur is not None:
+            await limiteur.attendre()
+
+        delai = delai_initial * 2**tentative
+        try:
+            async with session.get(url) as response:
+                if response.status in CODES_A_REESSAYER:
+                    # respecter le délai demandé par l'API quand il est fourni
+                    retry_after = response.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delai = max(delai, float(retry_after))
+                elif response.status >= 400:
+                    break
+                else:
+                    return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            pass
+
+        if tentative < tentatives - 1:
+            await asyncio.sleep(delai)
+
+    stats["echecs"] = stats.get("echecs", 0) + 1
+    return None
+
+
+def chemin_cache(dossier_cache: str, url: str) -> str:
+    """
+    Calcule l'emplacement d'une réponse dans le cache disque, adressé par le hash de l'URL
+
+    Args:
+        dossier_cache (str): Dossier du cache
+        url (str): URL de la requête
+
+    Returns:
+        str: Chemin du fichier de cache
+    """
+    return os.path.join(dossier_cache, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+
+async def get_json_en_cache(
+    session: aiohttp.ClientSession,
+    url: str,
+    dossier_cache: str,
+    limiteur: Optional[LimiteurDebit] = None,
+    stats: Optional[Dict[str, int]] = None,
+    **options: Any,
+) -> Optional[Any]:
+    """
+    Comme get_json, mais lit d'abord la réponse dans le cache disque
+    et y enregistre les nouvelles réponses valides
+
+    Args:
+        session (aiohttp.ClientSession): Session HTTP partagée
+        url (str): URL à interroger
+        dossier_cache (str): Dossier du cache disque
+        limiteur (Optional[LimiteurDebit]): Limiteur de débit à respecter
+        stats (Optional[Dict[str, int]]): Compteurs, dont "cache" pour les réponses lues sur disque
+        **options: Options transmises à get_json
+
+    Returns:
+        Optional[Any]: Le JSON décodé, ou None si la requête a échoué
+    """
+    stats = stats if stats is not None else {}
+    chemin = chemin_cache(dossier_cache, url)
+    if os.path.isfile(chemin):
+        stats["cache"] = stats.get("cache", 0) + 1
+        with open(chemin, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    data = await get_json(session, url, limiteur, stats=stats, **options)
+    if data is not None:
+        os.makedirs(dossier_cache, exist_ok=True)
+        # écriture atomique : un fichier de cache n'est jamais lu à moitié écrit
+        temporaire = f"{chemin}.{os.getpid()}.tmp"
+        with open(temporaire, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(temporaire, chemin)
+    return data
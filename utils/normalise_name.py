@@ -1,8 +1,51 @@
 import re
 import unicodedata
+import numpy as np
+import pandas as pd
+
+# Caractères supprimés par la normalisation : tout sauf les lettres (accentuées comprises)
+NON_LETTRES = re.compile(r'[^a-zA-ZÀ-ÿ]')
 
 def normalize_name(name:str) ->str:
     """Nettoyer et normaliser un nom en ne conservant que les lettres, et en les mettant en minuscules"""
     # Supprimer les caractères non alphabétiques et normaliser les accents
     name = ''.join(re.findall(r'[a-zA-ZÀ-ÿ]', str(name)))  # Inclure les lettres accentuées
-    return unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('ASCII').lower()
\ No newline at end of file
+    return unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('ASCII').lower()
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """
+    Version vectorisée de normalize_name pour une colonne entière : chaque valeur
+    distincte n'est normalisée qu'une fois, avec les opérations .str de pandas,
+    et le résultat est identique à normalize_name appliqué ligne par ligne
+
+    Args:
+        names (pd.Series): Les noms à normaliser
+
+    Returns:
+        pd.Series: Les noms normalisés, avec le même index
+    """
+    manquants = names.isna().to_numpy()
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        # les catégories sont déjà les valeurs distinctes
+        uniques = names.cat.categories
+        codes = names.cat.codes.to_numpy()[~manquants]
+    else:
+        codes, uniques = pd.factorize(names[~manquants])
+
+    textes = pd.Series([str(valeur) for valeur in uniques], dtype=object)
+    normalises = (
+        textes.str.replace(NON_LETTRES, '', regex=True)
+        .str.normalize('NFKD')
+        .str.encode('ASCII', 'ignore')
+        .str.decode('ASCII')
+        .str.lower()
+    ).to_numpy(dtype=object)
+
+    if not manquants.any():
+        return pd.Series(normalises[codes], index=names.index, name=names.name, dtype=object)
+
+    resultat = np.empty(len(names), dtype=object)
+    resultat[~manquants] = normalises[codes]
+    # NaN, None et pd.NA ne donnent pas le même texte avec str() : traités un par un
+    resultat[manquants] = [normalize_name(valeur) for valeur in names[manquants]]
+    return pd.Series(resultat, index=names.index, name=names.name, dtype=object)
@@ -0,0 +1,403 @@
+import argparse
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+import requests
+
+from utils.chemins import (
+    CHEMINS_AGREGATS,
+    CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
+    CLEANED_DATA_PATH_SALAIRE,
+    GENERER_TOPOJSON,
+    RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
+    RAW_DATA_PATH_SALAIRE,
+)
+from utils.demarrage_rapide import verifier_acces_reseau
+from utils.get_data import URL_COMMUNES_ILE_DE_FRANCE, URL_SALAIRE
+
+# Manifeste des empreintes (hash + taille) des entrées et sorties de chaque étape
+MANIFEST_PATH = os.path.join("data", "manifest.json")
+TAILLE_BLOC = 1024 * 1024
+CHEMIN_COORDONNEES = os.path.join("data", "cleaned", "cleanedcoordonnees.xlsx")
+
+# Fichiers Excel réécrits par le pipeline : openpyxl y inscrit la date d'écriture,
+# leur empreinte porte donc sur les valeurs des cellules et non sur les octets
+EXCEL_GENERES = {CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE, CHEMIN_COORDONNEES}
+
+
+def _executer_get_data(force: bool) -> None:
+    from utils.get_data import download_all_data
+    download_all_data(force=force)
+
+
+def _executer_clean_data(force: bool) -> None:
+    from utils.clean_data import clean_all_raw_files
+    clean_all_raw_files(force=force)
+
+
+def _executer_agregats() -> None:
+    from utils.agregats import generer_agregats
+    generer_agregats()
+
+
+def _executer_figures_statiques() -> None:
+    from src.data_store import get_df_filtre_idf
+    from src.figures_statiques import prerendre_figures
+    prerendre_figures(get_df_filtre_idf())
+
+
+def _executer_get_coordonees() -> None:
+    from utils.get_coordonees import CHEMIN_DONNEES_ENTREE, CHEMIN_DONNEES_SORTIE, extraire_coordonnees
+    extraire_coordonnees(CHEMIN_DONNEES_ENTREE, CHEMIN_DONNEES_SORTIE)
+
+
+def _executer_get_geojson() -> None:
+    from utils.get_geojson import generer_geojson
+    generer_geojson()
+
+
+# Étapes du pipeline, dans l'ordre d'exécution. Les entrées "url" sont des fichiers
+# distants dont l'empreinte vient des en-têtes HTTP (ETag, Last-Modified, taille).
+# Le code de chaque étape fait partie de ses entrées : le modifier relance l'étape.
+# Les "options" (variables d'environnement qui changent les sorties) comptent parmi les entrées.
+# Les étapes "partielles" (téléchargement, nettoyage) savent ne produire que leurs sorties
+# absentes : leur "executer" reçoit force=True quand une entrée ou une sortie existante a
+# changé, False quand il ne manque que des sorties. Les autres recalculent toujours tout.
+ETAPES: List[Dict[str, Any]] = [
+    {
+        "nom": "get_data",
+        "urls": [URL_SALAIRE, URL_COMMUNES_ILE_DE_FRANCE],
+        "entrees": [os.path.join("utils", "get_data.py")],
+        "sorties": [RAW_DATA_PATH_SALAIRE, RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE],
+        "executer": _executer_get_data,
+        "partielle": True,
+    },
+    {
+        "nom": "clean_data",
+        "urls": [],
+        "entrees": [
+            os.path.join("utils", "clean_data.py"),
+            RAW_DATA_PATH_SALAIRE,
+            RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
+        ],
+        "sorties": [CLEANED_DATA_PATH_SALAIRE, CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE],
+        "executer": _executer_clean_data,
+        "partielle": True,
+    },
+    {
+        "nom": "agregats",
+        "urls": [],
+        "entrees": [os.path.join("utils", "agregats.py"), CLEANED_DATA_PATH_SALAIRE],
+        "sorties": list(CHEMINS_AGREGATS.values()),
+        "executer": _executer_agregats,
+    },
+    {
+        "nom": "figures_statiques",
+        "urls": [],
+        "entrees": [
+            os.path.join("src", "figures_statiques.py"),
+            os.path.join("src", "binning.py"),
+            os.path.join("src", "data_store.py"),
+            os.path.join("src", "components", "histogram.py"),
+            os.path.join("src", "components", "histogram_salary_range.py"),
+            os.path.join("src", "components", "heatmap_chomage.py"),
+            os.path.join("src", "components", "heatmap_retraite.py"),
+            os.path.join("src", "components", "heatmap_revenu_non_activite.py"),
+            CLEANED_DATA_PATH_SALAIRE,
+            CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
+        ],
+        "sorties": [os.path.join("data", "figures", "index.json")],
+        "executer": _executer_figures_statiques,
+    },
+    {
+        "nom": "get_coordonees",
+        "urls": [],
+        "entrees": [
+            os.path.join("utils", "get_coordonees.py"),
+            CLEANED_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
+        ],
+        "sorties": [CHEMIN_COORDONNEES],
+        "executer": _executer_get_coordonees,
+    },
+    {
+        "nom": "get_geojson",
+        "urls": [],
+        "entrees": [
+            os.path.join("utils", "get_geojson.py"),
+            CHEMIN_COORDONNEES,
+            CHEMINS_AGREGATS["commune"],
+            os.path.join("data", "geojson", "arrondissements.geojson"),
+            RAW_DATA_PATH_COMMUNES_ILE_DE_FRANCE,
+        ] + ([os.path.join("utils", "topojson.py")] if GENERER_TOPOJSON else []),
+        "options": {"DASHBOARD_TOPOJSON": GENERER_TOPOJSON},
+        "sorties": [
+            os.path.join("data", "geojson", "communesiledefrance.geojson"),
+            os.path.join("data", "geojson", "communesiledefrance.z0.geojson"),
+            os.path.join("data", "geojson", "communesiledefrance.z10.geojson"),
+            os.path.join("data", "geojson", "communesiledefrance.z12.geojson"),
+        ] + ([os.path.join("data", "geojson", "communesiledefrance.topojson")] if GENERER_TOPOJSON else []),
+        "executer": _executer_get_geojson,
+    },
+]
+
+
+def empreinte_fichier(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Calcule l'empreinte d'un fichier local : hash SHA-256 du contenu et taille
+
+    Args:
+        file_path (str): Chemin du fichier
+
+    Returns:
+        Optional[Dict[str, Any]]: {"sha256", "taille"}, ou None si le fichier n'existe pas
+    """
+    if not os.path.isfile(file_path):
+        return None
+    if file_path in EXCEL_GENERES:
+        return empreinte_excel(file_path)
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for bloc in iter(lambda: file.read(TAILLE_BLOC), b""):
+            sha256.update(bloc)
+    return {"sha256": sha256.hexdigest(), "taille": os.path.getsize(file_path)}
+
+
+def empreinte_excel(file_path: str) -> Dict[str, Any]:
+    """
+    Calcule l'empreinte du contenu d'un classeur Excel : hash SHA-256 des valeurs
+    des cellules de chaque feuille, indépendant des métadonnées du fichier
+
+    Args:
+        file_path (str): Chemin du classeur
+
+    Returns:
+        Dict[str, Any]: {"sha256", "lignes"}
+    """
+    from openpyxl import load_workbook
+
+    sha256 = hashlib.sha256()
+    lignes = 0
+    classeur = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for feuille in classeur.worksheets:
+            sha256.update(feuille.title.encode("utf-8"))
+            for ligne in feuille.iter_rows(values_only=True):
+                sha256.update(repr(ligne).encode("utf-8"))
+                lignes += 1
+    finally:
+        classeur.close()
+    return {"sha256": sha256.hexdigest(), "lignes": lignes}
+
+
+def empreinte_url(url: str) -> Optional[Dict[str, Any]]:
+    """
+    Calcule l'empreinte d'un fichier distant à partir des en-têtes d'une requête HEAD
+
+    Args:
+        url (str): URL du fichier distant
+
+    Returns:
+        Optional[Dict[str, Any]]: ETag, Last-Modified et taille, ou None si le serveur est injoignable
+    """
+    verifier_acces_reseau(url)
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=10)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None
+
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "taille": response.headers.get("Content-Length"),
+    }
+
+
+def charger_manifest(file_path: str = MANIFEST_PATH) -> Dict[str, Any]:
+    """
+    Charge le manifeste des étapes déjà construites
+
+    Args:
+        file_path (str): Chemin du manifeste
+
+    Returns:
+        Dict[str, Any]: Le manifeste, vide s'il n'existe pas encore
+    """
+    if not os.path.isfile(file_path):
+        return {}
+    with open(file_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def sauvegarder_manifest(manifest: Dict[str, Any], file_path: str = MANIFEST_PATH) -> None:
+    """
+    Sauvegarde le manifeste des étapes construites
+
+    Args:
+        manifest (Dict[str, Any]): Le manifeste à sauvegarder
+        file_path (str): Chemin du manifeste
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+
+
+def empreintes_entrees(etape: Dict[str, Any], verifier_sources: bool = True) -> Dict[str, Any]:
+    """
+    Calcule les empreintes courantes des entrées d'une étape (fichiers, URL et options)
+
+    Args:
+        etape (Dict[str, Any]): L'étape du pipeline
+        verifier_sources (bool): Si False, les fichiers distants ne sont pas interrogés
+            (empreinte None, comme un serveur injoignable)
+
+    Returns:
+        Dict[str, Any]: Empreinte de chaque entrée, indexée par chemin, URL ou nom d'option (dont la valeur sert d'empreinte)
+    """
+    empreintes = {chemin: empreinte_fichier(chemin) for chemin in etape["entrees"]}
+    empreintes.update({url: empreinte_url(url) if verifier_sources else None for url in etape["urls"]})
+    empreintes.update(etape.get("options", {}))
+    return empreintes
+
+
+def enregistrer_etape(etape: Dict[str, Any], manifest: Dict[str, Any], entrees: Dict[str, Any]) -> None:
+    """
+    Enregistre dans le manifeste les empreintes courantes d'une étape. Une empreinte
+    distante inconnue (serveur non interrogé ou injoignable) garde sa valeur précédente
+
+    Args:
+        etape (Dict[str, Any]): L'étape du pipeline
+        manifest (Dict[str, Any]): Le manifeste, modifié en place
+        entrees (Dict[str, Any]): Empreintes courantes des entrées de l'étape
+    """
+    precedentes = manifest.get(etape["nom"], {}).get("entrees", {})
+    manifest[etape["nom"]] = {
+        "entrees": {
+            cle: precedentes.get(cle) if cle in etape["urls"] and empreinte is None else empreinte
+            for cle, empreinte in entrees.items()
+        },
+        "sorties": {chemin: empreinte_fichier(chemin) for chemin in etape["sorties"]},
+    }
+
+
+def raisons_reconstruction(etape: Dict[str, Any], manifest: Dict[str, Any],
+                           entrees: Dict[str, Any]) -> List[str]:
+    """
+    Liste les raisons pour lesquelles une étape doit être relancée
+
+    Args:
+        etape (Dict[str, Any]): L'étape du pipeline
+        manifest (Dict[str, Any]): Le manifeste des constructions précédentes
+        entrees (Dict[str, Any]): Empreintes courantes des entrées de l'étape
+
+    Returns:
+        List[str]: Les raisons (liste vide si l'étape est à jour)
+    """
+    enregistrement = manifest.get(etape["nom"])
+    if enregistrement is None:
+        manquantes = [chemin for chemin in etape["sorties"] if not os.path.isfile(chemin)]
+        return [f"jamais construite, sortie absente : {chemin}" for chemin in manquantes]
+
+    raisons = []
+    for cle, empreinte in entrees.items():
+        # un fichier distant injoignable est considéré comme inchangé
+        if cle in etape["urls"] and empreinte is None:
+            continue
+        if enregistrement["entrees"].get(cle) != empreinte:
+            raisons.append(f"entrée modifiée : {cle}")
+
+    for chemin in etape["sorties"]:
+        empreinte = empreinte_fichier(chemin)
+        if empreinte is None:
+            raisons.append(f"sortie absente : {chemin}")
+        elif enregistrement["sorties"].get(chemin) != empreinte:
+            raisons.append(f"sortie modifiée : {chemin}")
+    return raisons
+
+
+def artefacts_manquants(etapes: List[str]) -> List[str]:
+    """
+    Liste les sorties absentes des étapes données, sans rien recalculer ni accéder au réseau
+
+    Args:
+        etapes (List[str]): Noms des étapes dont les sorties sont nécessaires
+
+    Returns:
+        List[str]: Chemins des sorties absentes
+    """
+    return [
+        chemin
+        for etape in ETAPES
+        if etape["nom"] in etapes
+        for chemin in etape["sorties"]
+        if not os.path.isfile(chemin)
+    ]
+
+
+def executer_pipeline(etapes: Optional[List[str]] = None, dry_run: bool = False,
+                      force: bool = False, verifier_sources: bool = True) -> List[str]:
+    """
+    Relance uniquement les étapes dont les entrées ont changé depuis la dernière construction.
+    Une étape absente du manifeste dont toutes les sorties existent déjà n'est pas relancée :
+    le manifeste est initialisé à partir de ces sorties
+
+    Args:
+        etapes (Optional[List[str]]): Noms des étapes à considérer (toutes par défaut)
+        dry_run (bool): Si True, affiche ce qui serait reconstruit sans rien exécuter
+        force (bool): Si True, relance toutes les étapes considérées
+        verifier_sources (bool): Si False, n'interroge pas les serveurs des fichiers distants
+
+    Returns:
+        List[str]: Noms des étapes reconstruites (ou qui le seraient en dry-run)
+    """
+    manifest = charger_manifest()
+    sorties_modifiees: List[str] = []
+    reconstruites = []
+
+    for etape in ETAPES:
+        if etapes is not None and etape["nom"] not in etapes:
+            continue
+
+        entrees = empreintes_entrees(etape, verifier_sources)
+        raisons = ["reconstruction forcée"] if force else raisons_reconstruction(etape, manifest, entrees)
+        # en dry-run, les sorties des étapes précédentes n'ont pas encore changé
+        if dry_run:
+            raisons += [f"dépend de : {chemin}" for chemin in etape["entrees"] if chemin in sorties_modifiees]
+
+        if not raisons:
+            print(f"{etape['nom']} : à jour")
+            if etape["nom"] not in manifest and not dry_run:
+                enregistrer_etape(etape, manifest, entrees)
+                sauvegarder_manifest(manifest)
+            continue
+
+        reconstruites.append(etape["nom"])
+        sorties_modifiees.extend(etape["sorties"])
+        if dry_run:
+            print(f"[dry-run] {etape['nom']} serait reconstruite ({'; '.join(raisons)})")
+            continue
+
+        print(f"{etape['nom']} : reconstruction ({'; '.join(raisons)})")
+        if etape.get("partielle"):
+            # s'il ne manque que des sorties, seules celles-ci sont produites ; une entrée
+            # ou une sortie modifiée fait recalculer toutes les sorties
+            etape["executer"](force or any("sortie absente" not in raison for raison in raisons))
+        else:
+            etape["executer"]()
+        # les entrées sont relues après exécution : get_data peut avoir changé ses fichiers
+        enregistrer_etape(etape, manifest, empreintes_entrees(etape, verifier_sources))
+        sauvegarder_manifest(manifest)
+
+    return reconstruites
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruction incrémentale des données")
+    parser.add_argument("--dry-run", action="store_true", help="affiche ce qui serait reconstruit")
+    parser.add_argument("--force", action="store_true", help="relance toutes les étapes")
+    parser.add_argument("--etapes", nargs="+", choices=[etape["nom"] for etape in ETAPES],
+                        help="étapes à considérer (toutes par défaut)")
+    args = parser.parse_args()
+    executer_pipeline(etapes=args.etapes, dry_run=args.dry_run, force=args.force)
@@ -0,0 +1,243 @@
+import math
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+# Nombre de positions de la grille de quantification sur chaque axe
+QUANTIFICATION = 100_000
+
+Point = Tuple[int, int]
+
+
+def _quantifier_anneau(anneau: List[List[float]], origine: Tuple[float, float],
+                       echelle: Tuple[float, float]) -> List[Point]:
+    """
+    Ramène un anneau sur la grille entière et retire les points répétés consécutifs
+
+    Args:
+        anneau (List[List[float]]): Coordonnées [lon, lat] de l'anneau (fermé)
+        origine (Tuple[float, float]): Coin inférieur gauche de l'emprise
+        echelle (Tuple[float, float]): Taille d'une case de la grille sur chaque axe
+
+    Returns:
+        List[Point]: Points entiers de l'anneau, toujours fermé
+    """
+    points: List[Point] = []
+    for x, y in (coordonnees[:2] for coordonnees in anneau):
+        point = (round((x - origine[0]) / echelle[0]), round((y - origine[1]) / echelle[1]))
+        if not points or point != points[-1]:
+            points.append(point)
+    if points[0] != points[-1]:
+        points.append(points[0])
+    return points
+
+
+def _anneaux_geometrie(geometrie: Dict[str, Any]) -> List[List[List[List[float]]]]:
+    """
+    Renvoie les polygones d'une géométrie, chacun comme liste d'anneaux
+
+    Args:
+        geometrie (Dict[str, Any]): Géométrie GeoJSON (Polygon ou MultiPolygon)
+
+    Returns:
+        List: Liste de polygones (vide pour les autres types)
+    """
+    if geometrie["type"] == "Polygon":
+        return [geometrie["coordinates"]]
+    if geometrie["type"] == "MultiPolygon":
+        return geometrie["coordinates"]
+    return []
+
+
+def _jonctions(anneaux: List[List[Point]]) -> Set[Point]:
+    """
+    Trouve les jonctions : points où des frontières se séparent, c'est-à-dire présents
+    dans plusieurs anneaux avec des voisins différents
+
+    Args:
+        anneaux (List[List[Point]]): Anneaux quantifiés et fermés
+
+    Returns:
+        Set[Point]: Les jonctions
+    """
+    voisins: Dict[Point, frozenset] = {}
+    jonctions: Set[Point] = set()
+    for anneau in anneaux:
+        n = len(anneau) - 1
+        for i in range(n):
+            point = anneau[i]
+            paire = frozenset((anneau[i - 1] if i else anneau[n - 1], anneau[i + 1]))
+            if point not in voisins:
+                voisins[point] = paire
+            elif voisins[point] != paire:
+                jonctions.add(point)
+    return jonctions
+
+
+def _decouper_anneau(anneau: List[Point], jonctions: Set[Point]) -> List[Tuple[Point, ...]]:
+    """
+    Découpe un anneau en arcs aux jonctions ; sans jonction, l'anneau entier forme un arc
+    qui commence à son plus petit point (ainsi deux anneaux identiques donnent le même arc)
+
+    Args:
+        anneau (List[Point]): Anneau quantifié et fermé
+        jonctions (Set[Point]): Les jonctions
+
+    Returns:
+        List[Tuple[Point, ...]]: Les arcs, dans l'ordre de parcours de l'anneau
+    """
+    points = anneau[:-1]
+    positions = [i for i, point in enumerate(points) if point in jonctions]
+    if not positions:
+        debut = points.index(min(points))
+        tournes = points[debut:] + points[:debut]
+        return [tuple(tournes + tournes[:1])]
+
+    debut = positions[0]
+    tournes = points[debut:] + points[:debut] + [points[debut]]
+    arcs = []
+    courant = [tournes[0]]
+    for point in tournes[1:]:
+        courant.append(point)
+        if point in jonctions:
+            arcs.append(tuple(courant))
+            courant = [point]
+    return arcs
+
+
+def encoder_topojson(geojson: Dict[str, Any], nom_objet: str = "communes",
+                     quantification: int = QUANTIFICATION) -> Dict[str, Any]:
+    """
+    Encode une FeatureCollection de polygones en TopoJSON : les frontières communes
+    à deux communes voisines ne sont stockées qu'une fois (arcs partagés), les coordonnées
+    sont quantifiées sur une grille entière puis codées en écarts successifs
+
+    Args:
+        geojson (Dict[str, Any]): FeatureCollection GeoJSON (Polygon et MultiPolygon)
+        nom_objet (str): Nom de l'objet dans la topologie
+        quantification (int): Nombre de positions de la grille sur chaque axe
+
+    Returns:
+        Dict[str, Any]: La topologie
+    """
+    features = geojson.get("features", [])
+    coordonnees = [
+        point
+        for feature in features
+        for polygone in _anneaux_geometrie(feature["geometry"])
+        for anneau in polygone
+        for point in anneau
+    ]
+    if coordonnees:
+        x0, y0 = min(point[0] for point in coordonnees), min(point[1] for point in coordonnees)
+        x1, y1 = max(point[0] for point in coordonnees), max(point[1] for point in coordonnees)
+    else:
+        x0 = y0 = x1 = y1 = 0.0
+    echelle = ((x1 - x0) / (quantification - 1) or 1.0, (y1 - y0) / (quantification - 1) or 1.0)
+
+    # polygones quantifiés de chaque feature
+    polygones_features = [
+        [[_quantifier_anneau(anneau, (x0, y0), echelle) for anneau in polygone]
+         for polygone in _anneaux_geometrie(feature["geometry"])]
+        for feature in features
+    ]
+    jonctions = _jonctions([anneau for polygones in polygones_features for polygone in polygones for anneau in polygone])
+
+    arcs: List[Tuple[Point, ...]] = []
+    index_arcs: Dict[Tuple[Point, ...], int] = {}
+
+    def indice_arc(arc: Tuple[Point, ...]) -> int:
+        # un arc déjà rencontré en sens inverse est référencé par son complément (~i)
+        if arc in index_arcs:
+            return index_arcs[arc]
+        inverse = arc[::-1]
+        if inverse in index_arcs:
+            return ~index_arcs[inverse]
+        index_arcs[arc] = len(arcs)
+        arcs.append(arc)
+        return index_arcs[arc]
+
+    geometries = []
+    for feature, polygones in zip(features, polygones_features):
+        arcs_polygones = [
+            [[indice_arc(arc) for arc in _decouper_anneau(anneau, jonctions)] for anneau in polygone]
+            for polygone in polygones
+        ]
+        geometrie: Dict[str, Any] = {"properties": feature.get("properties", {})}
+        if feature["geometry"]["type"] == "Polygon":
+            geometrie.update(type="Polygon", arcs=arcs_polygones[0])
+        elif feature["geometry"]["type"] == "MultiPolygon":
+            geometrie.update(type="MultiPolygon", arcs=arcs_polygones)
+        else:
+            # autres géométries : conservées telles quelles (hors topologie)
+            geometrie.update(feature["geometry"])
+        geometries.append(geometrie)
+
+    # codage delta : premier point absolu, puis écarts au point précédent
+    arcs_delta = []
+    for arc in arcs:
+        deltas = [list(arc[0])]
+        deltas.extend([point[0] - precedent[0], point[1] - precedent[1]] for precedent, point in zip(arc, arc[1:]))
+        arcs_delta.append(deltas)
+
+    return {
+        "type": "Topology",
+        "bbox": [x0, y0, x1, y1],
+        "transform": {"scale": list(echelle), "translate": [x0, y0]},
+        "objects": {nom_objet: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": arcs_delta,
+    }
+
+
+def decoder_topojson(topologie: Dict[str, Any], nom_objet: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Décode une topologie en FeatureCollection GeoJSON : les arcs sont reconstitués
+    (cumul des écarts puis transformation inverse, vectorisés) et raccordés en anneaux. Les coordonnées
+    sont arrondies à la précision de la grille de quantification
+
+    Args:
+        topologie (Dict[str, Any]): La topologie (sortie de encoder_topojson)
+        nom_objet (Optional[str]): Objet à décoder, le premier de la topologie par défaut
+
+    Returns:
+        Dict[str, Any]: La FeatureCollection
+    """
+    objet = topologie["objects"][nom_objet or next(iter(topologie["objects"]))]
+    transformation = topologie.get("transform", {"scale": [1, 1], "translate": [0, 0]})
+    (sx, sy), (tx, ty) = transformation["scale"], transformation["translate"]
+    # décimales suffisantes pour distinguer deux positions voisines de la grille
+    decimales = max(0, math.ceil(-math.log10(min(sx, sy)))) + 1
+
+    # cumul des écarts de tous les arcs en une passe numpy, remis à zéro au début de chaque arc
+    longueurs = np.array([len(arc) for arc in topologie["arcs"]], dtype=np.int64)
+    if longueurs.sum():
+        ecarts = np.array([point for arc in topologie["arcs"] for point in arc], dtype=np.float64)
+        cumuls = np.cumsum(ecarts, axis=0)
+        fins = np.cumsum(longueurs)
+        depart = np.vstack([np.zeros((1, 2)), cumuls[fins[:-1] - 1]])
+        positions = cumuls - np.repeat(depart, longueurs, axis=0)
+        coordonnees = np.round(positions * [sx, sy] + [tx, ty], decimales).tolist()
+    else:
+        fins, coordonnees = longueurs, []
+    arcs: List[List[List[float]]] = [
+        coordonnees[fin - longueur:fin] for fin, longueur in zip(fins.tolist(), longueurs.tolist())
+    ]
+
+    def anneau(indices: List[int]) -> List[List[float]]:
+        # arc ~i : arc i parcouru en sens inverse ; chaque arc reprend le dernier point du précédent
+        points: List[List[float]] = []
+        for indice in indices:
+            arc = arcs[indice] if indice >= 0 else arcs[~indice][::-1]
+            points.extend(arc if not points else arc[1:])
+        return points
+
+    features = []
+    for geometrie in objet["geometries"]:
+        if geometrie["type"] == "Polygon":
+            geojson = {"type": "Polygon", "coordinates": [anneau(indices) for indices in geometrie["arcs"]]}
+        elif geometrie["type"] == "MultiPolygon":
+            geojson = {"type": "MultiPolygon",
+                       "coordinates": [[anneau(indices) for indices in polygone] for polygone in geometrie["arcs"]]}
+        else:
+            geojson = {"type": geometrie["type"], "coordinates": geometrie.get("coordinates")}
+        features.append({"type": "Feature", "geometry": geojson, "properties": geometrie.get("properties", {})})
+    return {"type": "FeatureCollection", "features": features}
@@ -0,0 +1,23 @@
+# Point d'entrée de production : gunicorn -c gunicorn.conf.py wsgi:server
+# Avec preload_app (gunicorn.conf.py), ce module est importé une seule fois dans le
+# processus maître : données, index et caches de figures y sont construits avant le fork,
+# puis partagés en copie sur écriture par tous les workers
+import os
+
+# les threads ne survivent pas au fork : préchauffer les caches de façon synchrone
+os.environ.setdefault("DASHBOARD_PRECHAUFFAGE_ARRIERE_PLAN", "0")
+
+from main import create_app, preparer_donnees  # noqa: E402
+from src.compression import activer_compression  # noqa: E402
+from utils.demarrage_rapide import est_actif  # noqa: E402
+
+# en mode démarrage rapide (DASHBOARD_FAST_START=1), seuls les artefacts existants sont lus
+preparer_donnees(est_actif())
+
+# construire toutes les sections dans le maître plutôt qu'une fois par worker
+app = create_app(prechauffer_sections=True)
+server = app.server
+
+# compression gzip/brotli des réponses JSON et HTML, ETag et Cache-Control (DASHBOARD_COMPRESSION=0 pour désactiver)
+if os.environ.get("DASHBOARD_COMPRESSION", "1") == "1":
+    activer_compression(server)